@@ -1,222 +1,796 @@
-import numpy as np
-import pandas as pd
-import math
-
-from mpl_toolkits.mplot3d import Axes3D
-import matplotlib.pyplot as plt
-from matplotlib import cm
-from matplotlib.ticker import LinearLocator, FormatStrFormatter
-
-
-class DecisionTree():
-    def __init__(self, x, y,  idxs = None, min_leaf=0,depth=0, max_depth = 0):
-        if idxs is None: idxs=np.arange(len(y))
-        #if depth is None: depth=0
-        #idxs === array[0,1,2,...,len(y)-1]
-        self.x,self.y,self.idxs,self.min_leaf,self.depth,self.max_depth = x,y,idxs,min_leaf,depth,max_depth
-        self.n,self.c = len(idxs), x.shape[1]
-        #c===number of columns/features in a leave===5 to start in this case which are ['school','sex','age','address','absences']
-        #n===number of rows/observations in a leave===649 to start===number of students
-        self.val = np.mean(y[idxs])
-        #val===avg value of the y colum in the node, this is for prediction
-
-        self.score = float('inf')
-        if self.depth<self.max_depth: self.find_varsplit() #when it is at the max_depth, no need for any splits
-
-    def find_varsplit(self):
-       for i in range(self.c): self.find_better_split(i)
-       #range(self.c) = array[0,1,2,...,Column Number(X)-1]
-       # loop through all the columns/features and run "self.find_better_split" on each of the columns/features
-       #self.find_better_split(i) is to find the best split point within a particular column
-       if self.score == float('inf'): return
-       # when self.score= infinity it indicates the score calculation hasn't been computed, so it is a leave, no need to go through the rest of the function
-       x = self.split_col
-       #self.split_col=== the unsorted column which was used to do the spliting === the split column which produce the best score
-       #'school' is the first column used for the spliting in the example
-       lhs = np.nonzero(x <= self.split)[0]
-       #seprate the best spliting column values that are smaller than the spliting point to the LHS
-       rhs = np.nonzero(x > self.split)[0]
-       # best spliting column values that are greater than the spliting point to the LHS
-   #    str=('')
-    #   for i in range(1,self.depth+1+1): str=str+" "
-     #  print(str+'L')
-       self.lhs = DecisionTree(self.x, self.y, self.idxs[lhs],min_leaf=self.min_leaf,depth=self.depth+1,max_depth=self.max_depth)
-       #iteraively call the object constructor to build leaves
-       #self.idxs[lhs] is to select a specific portion of the data into the DecisionTree() iterations
-   #    str = ('')
-    #   for i in range(1, self.depth + 1 + 1): str = str + " "
-     #  print(str + 'R')
-       self.rhs = DecisionTree(self.x, self.y, self.idxs[rhs],min_leaf=self.min_leaf,depth=self.depth+1,max_depth=self.max_depth)
-
-    def find_better_split(self, var_idx):
-        #var_inx === the index of the column being examinated
-        x, y = self.x.values[self.idxs, var_idx], self.y[self.idxs]
-        #x===the specific column being examinated, with the data portion correponds to self.idxs
-        #y===the y column, with the data portion correponds to self.idxs
-        sort_idx = np.argsort(x)
-        #sort_idx === sorting X in an accending order and return the indices of the sorted X
-        sort_y, sort_x = y[sort_idx], x[sort_idx]
-        #the sorting depends on the X column being examinated
-        rhs_cnt, rhs_sum, rhs_sum2 = self.n, sort_y.sum(), (sort_y ** 2).sum()
-        #initilization
-        #rhs_cnt=== observation count on the right hand side, it is 649 to start === the total number of obervations in this example
-        #rhs_sum === the total sum of the y value on the right hand side
-        #rhs_sum2 === the total sum of the square of the y value on the right hand side
-
-        lhs_cnt, lhs_sum, lhs_sum2 = 0, 0., 0.
-        #initilization
-
-
-
-        for i in range(0, self.n - self.min_leaf - 1): # loops through the rows in the column being examinated
-            #range(0, self.n - self.min_leaf - 1) is to make sure there will be at least (self.min_leaf) observations sitting in one of the leaves
-            #the initial === range(0, 646) = range (0, 649-2-1)
-            xi, yi = sort_x[i], sort_y[i]
-            #xi goes through the selected x column in an accending order, except for the last two elements as we need at least (self.min_leaf) observations sitting in one of the leaves
-            #yi goes through the y column in x's accending order
-
-            lhs_cnt += 1 # when we move one observation from the RHS to the LHS, we add it to the LHS count
-            rhs_cnt -= 1 # when we move one observation from the RHS to the LHS, we minus it from the RHS count
-            lhs_sum += yi # when we move one observation from the RHS to the LHS, we add the value to the LHS total sum
-            rhs_sum -= yi # when we move one observation from the RHS to the LHS, we minus the value from the RHS total sum
-            lhs_sum2 += yi ** 2
-            rhs_sum2 -= yi ** 2
-            if i < self.min_leaf or xi == sort_x[i + 1]:
-                continue
-            # when the number of the observations is less than self.min_leaf, no need to compute the score
-            # when the next xi is the same as the current xi, no need to compute the score again, as the split point will be the same and the score is the same
-
-            lhs_std = std_agg(lhs_cnt, lhs_sum, lhs_sum2)
-            #lhs_std====math.sqrt((lhs_sum2/lhs_cnt) - (lhs_sum/lhs_cnt)**2)=== the stand. deviation of the y observations in the LHS
-            rhs_std = std_agg(rhs_cnt, rhs_sum, rhs_sum2)
-            #the stand. deviation of the y observations in the RHS
-            curr_score = lhs_std * lhs_cnt + rhs_std * rhs_cnt
-            #curr_score = the score for the current split = weighted avg. of the stand. deviations of both sides
-            # the lower the stand. deviation = the observations within the leave are more alike, the split is better
-
-            if curr_score < self.score:
-                self.var_idx, self.score, self.split = var_idx, curr_score, xi
-            # when the the current score is better than the prior best score, updating self.score as the best score, and updating the split point
-
-    @property
-    def split_name(self):
-        return self.x.columns[self.var_idx]
-
-    @property
-    def split_col(self):
-        #print(self.idxs)
-        #print(self.var_idx)
-        #print(self.x.values)
-        return self.x.values[self.idxs, self.var_idx]
-
-    @property
-    def is_leaf(self):
-        return self.score == float('inf')
-        #when the score is infinity, there has been no computing of the score in that level, so it is a leaf
-
-    def __repr__(self):
-        s = f'n: {self.n}; val:{self.val}'
-        if not self.is_leaf:
-            s += f'; score:{self.score}; split:{self.split}; var:{self.split_name}'
-        return s
-
-    def predict(self, x):
-        return np.array([self.predict_row(xi) for xi in x]) #predicts each observation individually
-
-    def predict_row(self, xi):
-        if self.is_leaf: return self.val # if it is at the terminal leave, returns the final prediction
-        t = self.lhs if xi[self.var_idx] <= self.split else self.rhs #this directs the observation to the right leaves
-        return t.predict_row(xi) #recursivly call itself until it reaches a terminal leave
-
-def std_agg(cnt, s1, s2): return math.sqrt((s2/cnt) - (s1/cnt)**2)
-
-df=pd.read_csv('dataForDecisionTree.txt')
-X=df.loc[:,['school','sex','age','address','absences']]
-Y=np.asarray(df.G1+df.G2+df.G3)
-
-X=pd.get_dummies(X, columns=['school','sex','address'],drop_first=True)
-
-#print(X.shape) #(649, 5)
-#print(Y.shape) #(649,)
-
-
-#print(X)
-
-
-PortionForTesting=0.2
-curOff=int(PortionForTesting*len(df))
-
-X_Test=X[:curOff]
-Y_Test=Y[:curOff]
-
-X_Train=X[curOff:]
-Y_Train=Y[curOff:]
-
-#print(len(X_Train))
-#print(len(Y_Train))
-
-#print(X_Test)
-#print(X_Train)
-
-X_TesttoList=X_Test.values.tolist()
-
-
-MinLeaveList=[]
-Max_DepthList=[]
-OutSampleMAEList=[]
-
-
-for eachMinLeave in range(51):
-    for eachMax_depth in range(2,101):
-        tree = DecisionTree(X_Train, Y_Train, min_leaf=eachMinLeave, max_depth=eachMax_depth)
-        #loop through the combination of min_leaf and max_depth to find the combination that generate the best out of sample prediction
-        y_Test_hat = np.asarray(tree.predict(X_TesttoList))
-       # print(eachMinLeave,eachMax_depth)
-       # print(np.mean(np.abs(y_Test_hat - Y_Test)) / np.mean(Y_Test))
-
-        MinLeaveList.append(eachMinLeave)
-        Max_DepthList.append(eachMax_depth)
-        OutSampleMAEList.append(np.mean(np.abs(y_Test_hat - Y_Test)) / np.mean(Y_Test))
-
-
-MinLeaveArray=np.asarray(MinLeaveList)
-Max_DepthArray=np.asarray(Max_DepthList)
-OutSampleMAEArray=np.asarray(OutSampleMAEList)
-
-# Plot the surface.
-fig = plt.figure()
-ax = fig.gca(projection='3d')
-X = np.arange(0, 51)
-Y = np.arange(2, 101)
-X, Y = np.meshgrid(X, Y)
-Z = OutSampleMAEArray.reshape(X.shape)
-
-
-#print(X)
-#print(X.shape)
-#print(Y.shape)
-#print(Z.shape)
-
-
-
-surf = ax.plot_surface(X, Y, Z, cmap=cm.coolwarm,
-                       linewidth=0, antialiased=False)
-
-# Add a color bar which maps values to colors.
-fig.colorbar(surf, shrink=0.5, aspect=5)
-
-ax.set_xlabel('Min_Leave_Sample')
-ax.set_ylabel('Max_Depth')
-ax.set_zlabel('Out_Sample_MAE')
-
-plt.show()
-
-
-
-del df
-
-
-
-
-#['school;sex;age;address;famsize;Pstatus;Medu;Fedu;Mjob;Fjob;reason;guardian;traveltime;studytime;failures;schoolsup;famsup;paid;activities;nursery;higher;internet;romantic;famrel;freetime;goout;Dalc;Walc;health;absences;G1;G2;G3']
-
+import numpy as np
+import pandas as pd
+import math
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from mpl_toolkits.mplot3d import Axes3D
+import matplotlib.pyplot as plt
+from matplotlib import cm
+from matplotlib.ticker import LinearLocator, FormatStrFormatter
+
+from SharedArrays import attach_array, shared_arrays
+
+
+class DecisionTree():
+    def __init__(self, x, y,  idxs = None, min_leaf=0,depth=0, max_depth = 0, presort=False, sorted_idxs=None, goes_left=None,
+                 hist=False, max_bins=256, hist_data=None, hist_stats=None, max_features=None, rng=None, xv=None, stats=None):
+        if idxs is None: idxs=np.arange(len(y))
+        #if depth is None: depth=0
+        #idxs === array[0,1,2,...,len(y)-1]
+        self.x,self.y,self.idxs,self.min_leaf,self.depth,self.max_depth = x,y,idxs,min_leaf,depth,max_depth
+        if xv is None: xv = feature_matrix(x)
+        self.xv = xv
+        #xv === the features as one numpy array, resolved once at the root and shared by all the nodes,
+        #the nodes read their column slices from it instead of rebuilding x.values every time
+        self.n,self.c = len(idxs), x.shape[1]
+        #c===number of columns/features in a leave===5 to start in this case which are ['school','sex','age','address','absences']
+        #n===number of rows/observations in a leave===649 to start===number of students
+        self.val = np.mean(y[idxs])
+        #val===avg value of the y colum in the node, this is for prediction
+
+        self.hist, self.max_bins = hist, max_bins
+        #hist=True is the histogram mode for large datasets, every column is quantized once into at most max_bins bins
+        #and the split search of a node only looks at the per-bin count/sum/sum of squares instead of every row
+        if self.hist and self.depth<self.max_depth:
+            if hist_data is None: hist_data = self.bin_features()
+            if hist_stats is None: hist_stats = self.build_hist(idxs, hist_data)
+        self.hist_data, self.hist_stats = hist_data, hist_stats
+
+        self.presort = presort and not hist
+        #presort=True sorts every column only once at the root, the children inherit the sorted orders from their parent instead of calling np.argsort again
+        #it grows the same tree but is not faster: numpy's argsort is cheap next to the split scoring both modes share, and every node still gathers
+        #its sorted column and y through the sorted orders, so builds run at about 0.85-1.2x the default (within the run to run noise) while keeping a (c, n) index array per level,
+        #a memory-for-nothing trade on numeric data that is only kept as an opt-in
+        if self.presort and self.depth<self.max_depth:
+            if sorted_idxs is None:
+                sorted_idxs = np.stack([idxs[np.argsort(self.column(i)[idxs], kind='stable')] for i in range(self.c)])
+                #sorted_idxs[i] === self.idxs sorted by the i-th column, shape (c, n)
+            if goes_left is None: goes_left = np.zeros(len(y), dtype=bool)
+            #goes_left === scratch flags over all the rows, shared by the whole tree and only set while a node partitions its sorted_idxs
+        self.sorted_idxs, self.goes_left = sorted_idxs, goes_left
+
+        self.max_features = max_features
+        #max_features=None searches every column at every node, an int/float/'sqrt' searches a random subset of that many/that fraction/sqrt(c) columns at each node (random forests)
+        if self.max_features is not None and rng is None: rng = np.random.default_rng()
+        self.rng = rng
+        #the random generator shared by all the nodes of the tree
+        self.stats = stats
+        #stats=TreeStats() counts the nodes and times the split searches of the whole tree, None (the default) measures nothing
+
+        self.flat_tree = None
+        #the FlatTree form of this (sub)tree, built by predict the first time it is needed
+        self.score = float('inf')
+        if self.stats is not None: self.stats.add_node(self.depth)
+        if self.depth<self.max_depth: self.find_varsplit() #when it is at the max_depth, no need for any splits
+        self.sorted_idxs, self.hist_stats = None, None
+        #the sorted orders and the histograms are only needed while searching for the split
+
+    def find_varsplit(self):
+       cols = self.feature_subset()
+       if self.stats is not None: t0 = time.perf_counter()
+       if self.hist: self.find_better_split_hist(cols)
+       else:
+           for i in cols: self.find_better_split(i)
+       if self.stats is not None: self.stats.add_split_search(time.perf_counter() - t0, self.n * len(cols))
+       #cols = array[0,1,2,...,Column Number(X)-1] unless max_features picks a random subset
+       # loop through all the columns/features and run "self.find_better_split" on each of the columns/features
+       #self.find_better_split(i) is to find the best split point within a particular column
+       if self.score == float('inf'): return
+       # when self.score= infinity it indicates the score calculation hasn't been computed, so it is a leave, no need to go through the rest of the function
+       if self.hist: x, split = self.hist_data['codes'][self.var_idx, self.idxs], self.split_bin
+       #in histogram mode the bin codes are compared with the split bin, code <= split_bin is the same as x <= split
+       else: x, split = self.split_col, self.split
+       #self.split_col=== the unsorted column which was used to do the spliting === the split column which produce the best score
+       #'school' is the first column used for the spliting in the example
+       lhs = np.nonzero(x <= split)[0]
+       #seprate the best spliting column values that are smaller than the spliting point to the LHS
+       rhs = np.nonzero(x > split)[0]
+       # best spliting column values that are greater than the spliting point to the LHS
+       lhs_sorted, rhs_sorted = self.partition_sorted_idxs(self.idxs[lhs])
+       #the sorted orders of the children, None when not in presort mode
+       lhs_hist, rhs_hist = self.child_hists(self.idxs[lhs], self.idxs[rhs])
+       #the histograms of the children, None when not in histogram mode
+       self.sorted_idxs, self.hist_stats = None, None
+   #    str=('')
+    #   for i in range(1,self.depth+1+1): str=str+" "
+     #  print(str+'L')
+       self.lhs = self.child(self.idxs[lhs], sorted_idxs=lhs_sorted, hist_stats=lhs_hist)
+       #iteraively call the object constructor to build leaves
+       #self.idxs[lhs] is to select a specific portion of the data into the DecisionTree() iterations
+   #    str = ('')
+    #   for i in range(1, self.depth + 1 + 1): str = str + " "
+     #  print(str + 'R')
+       self.rhs = self.child(self.idxs[rhs], sorted_idxs=rhs_sorted, hist_stats=rhs_hist)
+
+    def child(self, idxs, **node_state):
+        #builds a child node with the same settings as this node, node_state holds what is specific to the child (e.g. its sorted orders)
+        return type(self)(self.x, self.y, idxs, min_leaf=self.min_leaf, depth=self.depth+1, max_depth=self.max_depth, xv=self.xv,
+                          presort=self.presort, goes_left=self.goes_left,
+                          hist=self.hist, max_bins=self.max_bins, hist_data=self.hist_data,
+                          max_features=self.max_features, rng=self.rng, stats=self.stats, **node_state)
+
+    def feature_subset(self):
+        #the columns the split search of this node looks at, in increasing order
+        if self.max_features is None: return np.arange(self.c)
+        if self.max_features == 'sqrt': k = int(np.sqrt(self.c))
+        elif isinstance(self.max_features, float): k = int(self.max_features * self.c)
+        else: k = self.max_features
+        k = min(max(k, 1), self.c)
+        return np.sort(self.rng.choice(self.c, k, replace=False))
+
+    def partition_sorted_idxs(self, lhs_idxs):
+        #splits every row of self.sorted_idxs into the rows going to the LHS and to the RHS, keeping their sorted order (stable partition)
+        if self.sorted_idxs is None or self.depth+1 >= self.max_depth: return None, None
+        #the children at max_depth never search for a split, so they don't need the sorted orders
+        self.goes_left[lhs_idxs] = True
+        mask = self.goes_left[self.sorted_idxs]
+        self.goes_left[lhs_idxs] = False
+        #reset the shared scratch flags for the other nodes
+        n_lhs = len(lhs_idxs)
+        return self.sorted_idxs[mask].reshape(self.c, n_lhs), self.sorted_idxs[~mask].reshape(self.c, self.n - n_lhs)
+        #boolean indexing walks the (c, n) array row by row, so every row keeps exactly its own sorted rows
+
+    def bin_features(self):
+        #quantizes every column once into at most self.max_bins bins, the bins are stored as a compact uint8 matrix
+        return hist_target(quantize_features(self.xv, self.idxs, len(self.y), self.max_bins), self.y)
+
+    def build_hist(self, idxs, hist_data):
+        #per-bin count, sum of y and sum of y**2 of the rows in idxs for every column, shape (3, c, n_bins)
+        n_bins = hist_data['n_bins']
+        y, y2 = hist_data['y'][idxs], hist_data['y2'][idxs]
+        hist = np.empty((3, self.c, n_bins))
+        for i in range(self.c):
+            codes = hist_data['codes'][i, idxs]
+            #one column at a time, the temporaries stay the size of one column however many columns there are
+            hist[0, i] = np.bincount(codes, minlength=n_bins)
+            hist[1, i] = np.bincount(codes, weights=y, minlength=n_bins)
+            hist[2, i] = np.bincount(codes, weights=y2, minlength=n_bins)
+        return hist
+
+    def child_hists(self, lhs_idxs, rhs_idxs):
+        #only the smaller child's histogram is built from its rows, the larger one is the parent's histogram minus the smaller one
+        if self.hist_stats is None or self.depth+1 >= self.max_depth: return None, None
+        if len(lhs_idxs) <= len(rhs_idxs):
+            lhs_hist = self.build_hist(lhs_idxs, self.hist_data)
+            return lhs_hist, self.hist_stats - lhs_hist
+        rhs_hist = self.build_hist(rhs_idxs, self.hist_data)
+        return self.hist_stats - rhs_hist, rhs_hist
+
+    def find_better_split_hist(self, cols):
+        #split search over the histograms of the columns in cols at once, it costs O(c * n_bins) instead of O(c * n)
+        cnt, s1, s2 = self.hist_stats
+        if cnt.shape[1] < 2: return
+        #every column is constant, nothing to split
+        lhs_cnt, lhs_sum, lhs_sum2 = (np.cumsum(h, axis=1)[:, :-1] for h in (cnt, s1, s2))
+        #splitting after bin b puts the bins 0..b on the LHS
+        rhs_cnt, rhs_sum, rhs_sum2 = self.n - lhs_cnt, s1.sum(axis=1)[:, None] - lhs_sum, s2.sum(axis=1)[:, None] - lhs_sum2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lhs_std = np.sqrt(np.maximum(lhs_sum2 / lhs_cnt - (lhs_sum / lhs_cnt) ** 2, 0))
+            rhs_std = np.sqrt(np.maximum(rhs_sum2 / rhs_cnt - (rhs_sum / rhs_cnt) ** 2, 0))
+        scores = lhs_std * lhs_cnt + rhs_std * rhs_cnt
+        scores[(lhs_cnt <= self.min_leaf) | (rhs_cnt <= self.min_leaf)] = float('inf')
+        #the same min_leaf rule as the exact mode, both sides need more than self.min_leaf observations
+        scores[np.arange(scores.shape[1]) >= self.hist_data['n_edges'][:, None]] = float('inf')
+        #the columns with fewer bins than n_bins
+        if len(cols) < self.c: scores[np.isin(np.arange(self.c), cols, invert=True)] = float('inf')
+        var_idx, b = np.unravel_index(np.argmin(scores), scores.shape)
+        if scores[var_idx, b] < self.score:
+            self.var_idx, self.score, self.split, self.split_bin = int(var_idx), scores[var_idx, b], self.hist_data['edges'][var_idx][b], b
+
+    def find_better_split(self, var_idx):
+        #vectorized version of find_better_split_loop, all candidate split points of the column are scored in one numpy pass
+        #it picks exactly the same var_idx/split as the loop: the running totals are accumulated in the same order and np.argmin keeps the first minimum just like the strict "<" in the loop
+        sort_x, sort_y = self.sorted_xy(var_idx)
+        sort_y = sort_y.astype(float)
+        end = self.n - self.min_leaf - 1
+        #end === the loop version only visits the rows in range(0, end), the rest always stay on the RHS
+        if end <= self.min_leaf: return
+        #no row can satisfy both i >= self.min_leaf and i < end, so there is no valid split in this column
+
+        sort_y2 = np.float_power(sort_y, 2)
+        #float_power squares through pow() like the scalar yi ** 2 in the loop, the plain array ** 2 can differ from it in the last digit
+        lhs_cnt = np.arange(1, end + 1)
+        rhs_cnt = self.n - lhs_cnt
+        #lhs_cnt[i]/rhs_cnt[i] === the observation counts once the rows 0..i have been moved from the RHS to the LHS
+        lhs_sum, lhs_sum2 = np.cumsum(sort_y[:end]), np.cumsum(sort_y2[:end])
+        rhs_sum = np.subtract.accumulate(np.concatenate(([sort_y.sum()], sort_y[:end])))[1:]
+        rhs_sum2 = np.subtract.accumulate(np.concatenate(([(sort_y ** 2).sum()], sort_y2[:end])))[1:]
+        #subtract.accumulate takes the rows off the RHS totals one by one, which keeps the floating point results identical to the loop
+
+        lhs_std = np.sqrt(np.maximum(lhs_sum2 / lhs_cnt - np.float_power(lhs_sum / lhs_cnt, 2), 0))
+        rhs_std = np.sqrt(np.maximum(rhs_sum2 / rhs_cnt - np.float_power(rhs_sum / rhs_cnt, 2), 0))
+        #same as std_agg, the tiny negative variances that floating point errors can produce are clipped to 0
+        scores = lhs_std * lhs_cnt + rhs_std * rhs_cnt
+        scores[:self.min_leaf] = float('inf')
+        #fewer than self.min_leaf observations in the LHS
+        scores[sort_x[:end] == sort_x[1:end + 1]] = float('inf')
+        #the next x is the same as the current x, the split point would not separate them
+
+        i = np.argmin(scores)
+        if scores[i] < self.score:
+            self.var_idx, self.score, self.split = var_idx, scores[i], sort_x[i]
+
+    def sorted_xy(self, var_idx):
+        #the column being examinated and the y column, both sorted by the column
+        if self.sorted_idxs is not None:
+            sort_rows = self.sorted_idxs[var_idx]
+            return self.column(var_idx)[sort_rows], self.y[sort_rows]
+        x, y = self.column(var_idx)[self.idxs], self.y[self.idxs]
+        sort_idx = np.argsort(x)
+        return x[sort_idx], y[sort_idx]
+
+    def find_better_split_loop(self, var_idx):
+        #row by row reference version of find_better_split
+        #var_inx === the index of the column being examinated
+        x, y = self.column(var_idx)[self.idxs], self.y[self.idxs]
+        #x===the specific column being examinated, with the data portion correponds to self.idxs
+        #y===the y column, with the data portion correponds to self.idxs
+        sort_idx = np.argsort(x)
+        #sort_idx === sorting X in an accending order and return the indices of the sorted X
+        sort_y, sort_x = y[sort_idx], x[sort_idx]
+        #the sorting depends on the X column being examinated
+        rhs_cnt, rhs_sum, rhs_sum2 = self.n, sort_y.sum(), (sort_y ** 2).sum()
+        #initilization
+        #rhs_cnt=== observation count on the right hand side, it is 649 to start === the total number of obervations in this example
+        #rhs_sum === the total sum of the y value on the right hand side
+        #rhs_sum2 === the total sum of the square of the y value on the right hand side
+
+        lhs_cnt, lhs_sum, lhs_sum2 = 0, 0., 0.
+        #initilization
+
+
+
+        for i in range(0, self.n - self.min_leaf - 1): # loops through the rows in the column being examinated
+            #range(0, self.n - self.min_leaf - 1) is to make sure there will be at least (self.min_leaf) observations sitting in one of the leaves
+            #the initial === range(0, 646) = range (0, 649-2-1)
+            xi, yi = sort_x[i], sort_y[i]
+            #xi goes through the selected x column in an accending order, except for the last two elements as we need at least (self.min_leaf) observations sitting in one of the leaves
+            #yi goes through the y column in x's accending order
+
+            lhs_cnt += 1 # when we move one observation from the RHS to the LHS, we add it to the LHS count
+            rhs_cnt -= 1 # when we move one observation from the RHS to the LHS, we minus it from the RHS count
+            lhs_sum += yi # when we move one observation from the RHS to the LHS, we add the value to the LHS total sum
+            rhs_sum -= yi # when we move one observation from the RHS to the LHS, we minus the value from the RHS total sum
+            lhs_sum2 += yi ** 2
+            rhs_sum2 -= yi ** 2
+            if i < self.min_leaf or xi == sort_x[i + 1]:
+                continue
+            # when the number of the observations is less than self.min_leaf, no need to compute the score
+            # when the next xi is the same as the current xi, no need to compute the score again, as the split point will be the same and the score is the same
+
+            lhs_std = std_agg(lhs_cnt, lhs_sum, lhs_sum2)
+            #lhs_std====math.sqrt((lhs_sum2/lhs_cnt) - (lhs_sum/lhs_cnt)**2)=== the stand. deviation of the y observations in the LHS
+            rhs_std = std_agg(rhs_cnt, rhs_sum, rhs_sum2)
+            #the stand. deviation of the y observations in the RHS
+            curr_score = lhs_std * lhs_cnt + rhs_std * rhs_cnt
+            #curr_score = the score for the current split = weighted avg. of the stand. deviations of both sides
+            # the lower the stand. deviation = the observations within the leave are more alike, the split is better
+
+            if curr_score < self.score:
+                self.var_idx, self.score, self.split = var_idx, curr_score, xi
+            # when the the current score is better than the prior best score, updating self.score as the best score, and updating the split point
+
+    @property
+    def split_name(self):
+        return self.x.columns[self.var_idx] if hasattr(self.x, 'columns') else self.var_idx
+
+    @property
+    def split_col(self):
+        #print(self.idxs)
+        #print(self.var_idx)
+        #print(self.x.values)
+        return self.column(self.var_idx)[self.idxs]
+
+    def column(self, var_idx):
+        #one column of the features, a view on self.xv (contiguous when x is a FeatureStore)
+        return self.xv[:, var_idx]
+
+    @property
+    def is_leaf(self):
+        return self.score == float('inf')
+        #when the score is infinity, there has been no computing of the score in that level, so it is a leaf
+
+    def __repr__(self):
+        s = f'n: {self.n}; val:{self.val}'
+        if not self.is_leaf:
+            s += f'; score:{self.score}; split:{self.split}; var:{self.split_name}'
+        return s
+
+    def predict(self, x):
+        if self.flat_tree is None: self.flat_tree = self.flatten()
+        return self.flat_tree.predict(x) #predicts all the observations at once on the flat form of the tree
+
+    def predict_row(self, xi):
+        if self.is_leaf: return self.val # if it is at the terminal leave, returns the final prediction
+        t = self.lhs if xi[self.var_idx] <= self.split else self.rhs #this directs the observation to the right leaves
+        return t.predict_row(xi) #recursivly call itself until it reaches a terminal leave
+
+    def flatten(self):
+        #compiles the node objects into a FlatTree, the nodes are numbered in depth first order with the root as node 0
+        nodes, stack = [], [self]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            if not node.is_leaf: stack += [node.rhs, node.lhs]
+            #the lhs is popped first, so it directly follows its parent
+        number = {id(node): i for i, node in enumerate(nodes)}
+        feature = np.array([-1 if node.is_leaf else node.var_idx for node in nodes], dtype=np.int32)
+        threshold = np.array([np.nan if node.is_leaf else float(node.split) for node in nodes])
+        left = np.array([-1 if node.is_leaf else number[id(node.lhs)] for node in nodes], dtype=np.int32)
+        right = np.array([-1 if node.is_leaf else number[id(node.rhs)] for node in nodes], dtype=np.int32)
+        value = np.array([node.val for node in nodes], dtype=float)
+        return FlatTree(feature, threshold, left, right, value)
+
+
+class FlatTree():
+    #array form of a DecisionTree: node i splits on column feature[i] at threshold[i] and sends the rows to left[i] / right[i],
+    #feature[i] == -1 marks a leaf, value[i] === the avg y of node i which is the prediction when it is a leaf
+    #it only keeps these parallel arrays, not the x, y and idxs every DecisionTree node holds on to
+    def __init__(self, feature, threshold, left, right, value):
+        self.feature, self.threshold, self.left, self.right, self.value = feature, threshold, left, right, value
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left, self.right, self.value))
+
+    def __len__(self):
+        return len(self.feature)
+
+    def __repr__(self):
+        return f'FlatTree(nodes: {len(self)}; leaves: {int((self.feature < 0).sum())}; bytes: {self.nbytes})'
+
+    def apply(self, x):
+        #the leaf each row of the 2-D x ends up in
+        x = np.asarray(x, dtype=float)
+        return self.descend(x, np.zeros(len(x), dtype=np.intp), np.arange(len(x)))
+
+    def descend(self, x, node, row):
+        #moves every (node[k], x[row[k]]) pair down to a leaf, all the pairs move down one level per iteration
+        node = node.copy()
+        active = np.arange(len(node))
+        #active === the pairs still sitting on an internal node
+        while active.size:
+            nd = node[active]
+            f = self.feature[nd]
+            internal = f >= 0
+            active, nd, f = active[internal], nd[internal], f[internal]
+            go_left = x[row[active], f] <= self.threshold[nd]
+            node[active] = np.where(go_left, self.left[nd], self.right[nd])
+        return node
+
+    @staticmethod
+    def concat(trees):
+        #packs several FlatTrees into one, returns it with the node number of each tree's root
+        sizes = np.array([len(t) for t in trees])
+        roots = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        shift = lambda child, root: np.where(child >= 0, child + root, -1).astype(np.int32)
+        return FlatTree(np.concatenate([t.feature for t in trees]), np.concatenate([t.threshold for t in trees]),
+                        np.concatenate([shift(t.left, r) for t, r in zip(trees, roots)]),
+                        np.concatenate([shift(t.right, r) for t, r in zip(trees, roots)]),
+                        np.concatenate([t.value for t in trees])), roots
+
+    def predict(self, x):
+        return self.value[self.apply(x)]
+
+    def predict_by_depth(self, x, max_depth):
+        #preds[d] === the predictions of the same tree cut at depth d, for d = 0..max_depth, shape (max_depth+1, rows)
+        #a tree grown to depth d is the first d levels of a deeper tree with the same min_leaf, so one pass down the tree scores every depth
+        x = np.asarray(x, dtype=float)
+        node = np.zeros(len(x), dtype=np.intp)
+        preds = np.empty((max_depth + 1, len(x)))
+        for d in range(max_depth + 1):
+            preds[d] = self.value[node]
+            #the node a row sits on at level d is a leaf of the tree cut at depth d
+            rows = np.nonzero(self.feature[node] >= 0)[0]
+            if d == max_depth or not rows.size:
+                preds[d + 1:] = preds[d]
+                #all the rows reached their leaves, the deeper cuts predict the same
+                break
+            nd = node[rows]
+            go_left = x[rows, self.feature[nd]] <= self.threshold[nd]
+            node[rows] = np.where(go_left, self.left[nd], self.right[nd])
+        return preds
+
+class TreeStats():
+    #opt-in counters of a tree build, pass the same TreeStats as stats= to one or more DecisionTrees (e.g. through GradientBoosting's tree_kwargs)
+    #split_seconds === the time spent in the split searches (find_better_split or find_better_split_hist) of all the nodes
+    #rows_scanned === the rows times the columns every split search looked at, in histogram mode the rows its histograms summarize
+    #the trees a RandomForest grows in worker processes count into copies of it, use max_workers=1 to measure those
+    def __init__(self):
+        self.nodes, self.max_depth, self.split_searches, self.split_seconds, self.rows_scanned = 0, 0, 0, 0.0, 0
+
+    def add_node(self, depth):
+        self.nodes += 1
+        self.max_depth = max(self.max_depth, depth)
+
+    def add_split_search(self, seconds, rows_scanned):
+        self.split_searches += 1
+        self.split_seconds += seconds
+        self.rows_scanned += rows_scanned
+
+    @property
+    def rows_per_second(self):
+        return self.rows_scanned / self.split_seconds if self.split_seconds > 0 else float('nan')
+
+    def as_dict(self):
+        return dict(nodes=self.nodes, max_depth=self.max_depth, split_searches=self.split_searches, split_seconds=self.split_seconds,
+                    rows_scanned=self.rows_scanned, rows_per_second=self.rows_per_second)
+
+    def __repr__(self):
+        return (f'TreeStats(nodes: {self.nodes}; max_depth: {self.max_depth}; split searches: {self.split_searches} in {self.split_seconds:.3f} s;'
+                f' {self.rows_per_second:,.0f} rows/s)')
+
+def std_agg(cnt, s1, s2): return math.sqrt((s2/cnt) - (s1/cnt)**2)
+
+def feature_matrix(x):
+    #the features of x (a DataFrame, a FeatureStore or a 2-D array) as one numpy array, without a copy when x is already a float array
+    if isinstance(x, FeatureStore): return x.values
+    return np.asarray(x.values if isinstance(x, pd.DataFrame) else x, dtype=float)
+
+
+class FeatureStore():
+    #column-major (Fortran order) float32 feature matrix saved as a .npy file and opened memory-mapped, so the training set can be larger than RAM,
+    #every column is one contiguous block of the file and the OS only pages in the parts the tree reads
+    #the column names are kept next to it in <path>.columns.json and the optional target in <path>.y.npy
+    #a FeatureStore can be passed to DecisionTree in place of the DataFrame
+    def __init__(self, path):
+        self.path = path
+        self.values = np.load(path, mmap_mode='r')
+        with open(path + '.columns.json') as f: self.columns = json.load(f)
+        self.y = np.load(path + '.y.npy', mmap_mode='r') if os.path.exists(path + '.y.npy') else None
+        self.shape = self.values.shape
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __repr__(self):
+        return f'FeatureStore({self.path}; rows: {self.shape[0]}; columns: {self.columns})'
+
+    def column(self, j):
+        return self.values[:, j]
+
+    @classmethod
+    def from_csv(cls, csv_path, path, features, dummies=(), drop_first=True, target=None, chunksize=100_000):
+        #converts the features columns of a csv into a FeatureStore at path, reading the csv chunksize rows at a time
+        #dummies are one hot encoded like pd.get_dummies(X, columns=dummies, drop_first=drop_first)
+        #target is an optional function of a chunk of the csv returning its y, e.g. lambda df: df.G1+df.G2+df.G3
+        categories, n = {col: set() for col in dummies}, 0
+        for chunk in pd.read_csv(csv_path, usecols=list(features), chunksize=chunksize):
+            for col in dummies: categories[col].update(chunk[col].dropna().unique())
+            n += len(chunk)
+        #first pass: the number of rows and the categories of every dummy column, so every chunk is encoded the same way
+        categories = {col: sorted(cats)[1 if drop_first else 0:] for col, cats in categories.items()}
+        columns = [col for col in features if col not in categories] + [f'{col}_{cat}' for col in dummies for cat in categories[col]]
+
+        values = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(n, len(columns)), fortran_order=True)
+        y = np.lib.format.open_memmap(path + '.y.npy', mode='w+', dtype=np.float64, shape=(n,)) if target is not None else None
+        start = 0
+        for chunk in pd.read_csv(csv_path, usecols=None if target is not None else list(features), chunksize=chunksize):
+            #target may need any column of the csv
+            block = [chunk[col].to_numpy(dtype=np.float32) for col in features if col not in categories]
+            block += [(chunk[col] == cat).to_numpy(dtype=np.float32) for col in dummies for cat in categories[col]]
+            values[start:start + len(chunk)] = np.column_stack(block)
+            if y is not None: y[start:start + len(chunk)] = np.asarray(target(chunk), dtype=np.float64)
+            start += len(chunk)
+        #second pass: encode and write the rows straight into the memory-mapped file
+        values.flush()
+        del values
+        if y is not None:
+            y.flush()
+            del y
+        with open(path + '.columns.json', 'w') as f: json.dump(columns, f)
+        return cls(path)
+
+def quantize_features(xv, idxs, n_rows, max_bins):
+    #bins every column of xv into at most max_bins bins, using only the rows in idxs to place the bin edges
+    #returns the bins without any y, hist_target adds the y the histograms are built from
+    if not 2 <= max_bins <= 256: raise ValueError(f"max_bins must be between 2 and 256, got {max_bins}")
+    c = xv.shape[1]
+    codes = np.zeros((c, n_rows), dtype=np.uint8)
+    #codes[i] === the bin of every row in the i-th column, shape (c, number of rows), the rows outside idxs stay in bin 0
+    edges = []
+    for i in range(c):
+        col = np.asarray(xv[idxs, i], dtype=float)
+        #one column at a time, so a memory-mapped FeatureStore never has more than one float64 column in memory
+        uniq = np.unique(col)
+        if len(uniq) <= max_bins: col_edges = uniq[:-1]
+        #few distinct values, every value gets its own bin and the histogram mode considers the same split points as the exact mode
+        else:
+            col_edges = np.unique(np.quantile(col, np.linspace(0, 1, max_bins + 1)[1:-1], method='inverted_cdf'))
+            col_edges = col_edges[col_edges < uniq[-1]]
+            #quantiles of the column, the split points are still values that occur in the data
+        codes[i, idxs] = np.searchsorted(col_edges, col, side='left')
+        #bin b holds col_edges[b-1] < x <= col_edges[b], so x <= col_edges[b] is the same as bin <= b
+        edges.append(col_edges)
+    n_bins = max(len(e) for e in edges) + 1
+    return {'codes': codes, 'edges': edges, 'n_edges': np.array([len(e) for e in edges]),
+            'n_bins': n_bins}
+
+def hist_target(bins, y):
+    #the hist_data of a DecisionTree in histogram mode: the bins of quantize_features with the y (and y**2) to build the histograms from
+    #the same bins can be reused with a new y, e.g. the residuals of every gradient boosting round
+    y = np.asarray(y, dtype=float)
+    return dict(bins, y=y, y2=y ** 2)
+
+def sweep_min_leaf_max_depth(x_train, y_train, x_test, y_test, min_leafs, max_depths, **tree_kwargs):
+    #out of sample MAE (relative to the avg y_test) of every (min_leaf, max_depth) pair, shape (len(min_leafs), len(max_depths))
+    #only one tree per min_leaf is grown, to the largest max_depth, and all the depth cutoffs are scored in a single traversal
+    #tree_kwargs are passed on to DecisionTree, e.g. presort=True or hist=True
+    mae = np.empty((len(min_leafs), len(max_depths)))
+    for i, min_leaf in enumerate(min_leafs):
+        tree = DecisionTree(x_train, y_train, min_leaf=min_leaf, max_depth=int(np.max(max_depths)), **tree_kwargs)
+        mae[i] = depth_cutoff_mae(tree, x_test, y_test, max_depths)
+    return mae
+
+def depth_cutoff_mae(tree, x_test, y_test, max_depths):
+    #out of sample MAE of the tree cut at each of max_depths
+    max_depths, y_test = np.asarray(max_depths), np.asarray(y_test)
+    preds = tree.flatten().predict_by_depth(x_test, int(max_depths.max()))[max_depths]
+    return np.mean(np.abs(preds - y_test), axis=1) / np.mean(y_test)
+
+worker_data = {}
+#the shared arrays of a worker process, set up once per process by init_shared_worker from the specs of shared_arrays
+
+def init_shared_worker(specs):
+    for key, spec in specs.items():
+        worker_data[key + '_shm'], worker_data[key] = attach_array(spec)
+
+def sweep_job(min_leaf, fold, max_depths, tree_kwargs):
+    #one (min_leaf, fold) job of parallel_sweep, the rows with fold id == fold are the test set and all the others are the training set
+    x, y, fold_of_row = worker_data['x'], worker_data['y'], worker_data['fold']
+    train, test = np.nonzero(fold_of_row != fold)[0], np.nonzero(fold_of_row == fold)[0]
+    tree = DecisionTree(x, y, idxs=train, min_leaf=min_leaf, max_depth=int(np.max(max_depths)), **tree_kwargs)
+    #idxs selects the training rows, no copy of the training set is made
+    return min_leaf, fold, depth_cutoff_mae(tree, x[test], y[test], max_depths)
+
+def parallel_sweep(x, y, min_leafs, max_depths, folds=5, seed=0, max_workers=None, mp_context=None, **tree_kwargs):
+    #cross validated version of sweep_min_leaf_max_depth, the (min_leaf, fold) jobs run on a ProcessPoolExecutor
+    #folds=k shuffles the rows into k folds, folds can also be an array with the fold id of every row,
+    #the rows with a negative fold id are always in the training set, e.g. the script's fixed 20% holdout is folds = [0]*curOff + [-1]*(n-curOff)
+    #returns the MAE surface of every fold, shape (number of folds, len(min_leafs), len(max_depths)), .mean(axis=0) is the cross validated surface
+    #x and y are put in shared memory once, the workers never get pickled DataFrames
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    if np.isscalar(folds):
+        fold_of_row = np.random.default_rng(seed).permutation(len(y)) % folds
+    else:
+        fold_of_row = np.asarray(folds)
+        if len(fold_of_row) != len(y): raise ValueError(f"folds has {len(fold_of_row)} fold ids for {len(y)} rows")
+    fold_ids = np.unique(fold_of_row[fold_of_row >= 0])
+
+    mae = np.empty((len(fold_ids), len(min_leafs), len(max_depths)))
+    row_of_min_leaf = {min_leaf: i for i, min_leaf in enumerate(min_leafs)}
+    col_of_fold = {fold: i for i, fold in enumerate(fold_ids)}
+    with shared_arrays(x=x, y=y, fold=fold_of_row.astype(np.int64)) as specs, \
+         ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context, initializer=init_shared_worker, initargs=(specs,)) as pool:
+        jobs = [pool.submit(sweep_job, min_leaf, fold, list(max_depths), tree_kwargs)
+                for min_leaf in sorted(min_leafs) for fold in fold_ids]
+        #the small min_leaf (large tree) jobs are submitted first so the pool does not end on one long job
+        for job in as_completed(jobs):
+            min_leaf, fold, fold_mae = job.result()
+            mae[col_of_fold[fold], row_of_min_leaf[min_leaf]] = fold_mae
+    return mae
+
+
+class RandomForest():
+    #bagging of DecisionTrees: every tree is grown on a bootstrap sample of the rows and only searches a random subset of max_features columns at each node
+    #the bootstrap samples are idxs arrays into the one copy of x and y, the trees are grown in parallel worker processes and kept as FlatTrees
+    #the out of bag (OOB) prediction of a row only averages the trees whose bootstrap sample missed that row, so oob_mae is an out of sample error
+    #without a separate holdout set
+    def __init__(self, x, y, n_trees=100, min_leaf=5, max_depth=10, max_features='sqrt', seed=0, max_workers=None, mp_context=None, **tree_kwargs):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        self.n_trees, self.min_leaf, self.max_depth, self.max_features = n_trees, min_leaf, max_depth, max_features
+        settings = dict(min_leaf=min_leaf, max_depth=max_depth, max_features=max_features, **tree_kwargs)
+        seeds = np.random.SeedSequence(seed).spawn(n_trees)
+        #one independent random stream per tree, the forest is the same whichever worker grows which tree
+
+        if max_workers == 1:
+            grown = [grow_forest_tree(x, y, tree_seed, settings) for tree_seed in seeds]
+        else:
+            with shared_arrays(x=x, y=y) as specs, \
+                 ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context, initializer=init_shared_worker, initargs=(specs,)) as pool:
+                grown = list(pool.map(forest_tree_job, seeds, [settings] * n_trees))
+
+        self.trees = [flat for flat, oob_rows, oob_preds in grown]
+        self.forest, self.roots = FlatTree.concat(self.trees)
+        #all the trees packed into one FlatTree, predict routes the rows down every tree at once
+        leaf, node = self.forest.feature < 0, np.arange(len(self.forest))
+        self.route_feature = np.where(leaf, 0, self.forest.feature).astype(np.intp)
+        self.route_threshold = np.where(leaf, np.inf, self.forest.threshold)
+        self.route_left = np.where(leaf, node, self.forest.left).astype(np.intp)
+        self.route_right = np.where(leaf, node, self.forest.right).astype(np.intp)
+        #the leaves point back to themselves (x <= inf always goes "left"), so predict can move every pair max_depth levels
+        #without checking which pairs already reached a leaf
+
+        oob_sum, oob_cnt = np.zeros(len(y)), np.zeros(len(y))
+        for flat, oob_rows, oob_preds in grown:
+            oob_sum[oob_rows] += oob_preds
+            oob_cnt[oob_rows] += 1
+        with np.errstate(invalid='ignore'):
+            self.oob_prediction = oob_sum / oob_cnt
+        #nan for the rows that are in the bootstrap sample of every tree
+        has_oob = oob_cnt > 0
+        self.oob_mae = np.mean(np.abs(self.oob_prediction[has_oob] - y[has_oob])) / np.mean(y[has_oob])
+        #the same relative MAE as the script's out of sample MAE
+
+    def __repr__(self):
+        return f'RandomForest(trees: {self.n_trees}; nodes: {len(self.forest)}; oob_mae: {self.oob_mae})'
+
+    def predict(self, x, chunk_pairs=2**17):
+        #avg prediction of all the trees, the (tree, row) pairs are routed down together, at most chunk_pairs pairs at a time
+        x = np.asarray(x, dtype=float)
+        preds = np.empty(len(x))
+        chunk = max(1, chunk_pairs // len(self.roots))
+        for start in range(0, len(x), chunk):
+            x_chunk = x[start:start + chunk]
+            flat_x = x_chunk.ravel()
+            row_start = np.tile(np.arange(len(x_chunk)) * x.shape[1], len(self.roots))
+            #x[row, feature] === flat_x[row_start + feature] for the pairs laid out tree by tree
+            node = np.repeat(self.roots, len(x_chunk)).astype(np.intp)
+            for _ in range(self.max_depth):
+                go_left = flat_x[row_start + self.route_feature[node]] <= self.route_threshold[node]
+                node = np.where(go_left, self.route_left[node], self.route_right[node])
+            preds[start:start + chunk] = self.forest.value[node].reshape(len(self.roots), len(x_chunk)).mean(axis=0)
+        return preds
+
+class GradientBoosting():
+    #least squares gradient boosting with shallow DecisionTrees as the weak learners
+    #every round fits a tree to the residuals y - F of the running prediction F and adds learning_rate * tree to F (shrinkage)
+    #subsample < 1 fits every tree on a random fraction of the rows, given x_valid/y_valid the training stops once the
+    #validation MSE has not improved for early_stopping_rounds rounds and the ensemble is cut back to its best round
+    def __init__(self, x, y, n_rounds=500, learning_rate=0.1, min_leaf=5, max_depth=3, subsample=1.0,
+                 x_valid=None, y_valid=None, early_stopping_rounds=20, seed=0, **tree_kwargs):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        self.learning_rate, self.min_leaf, self.max_depth, self.subsample = learning_rate, min_leaf, max_depth, subsample
+        rng = np.random.default_rng(seed)
+        n = len(y)
+
+        self.init_val = np.mean(y)
+        F = np.full(n, self.init_val)
+        #the running prediction of the training rows, updated in place every round
+        has_valid = x_valid is not None
+        if has_valid:
+            x_valid, y_valid = np.asarray(x_valid, dtype=float), np.asarray(y_valid, dtype=float)
+            F_valid = np.full(len(y_valid), self.init_val)
+        bins = quantize_features(x, np.arange(n), n, tree_kwargs.get('max_bins', 256)) if tree_kwargs.get('hist') else None
+        #in histogram mode the columns are binned once for all the rounds, only the residuals change
+        residual = np.empty(n)
+
+        self.trees, self.train_mse, self.valid_mse = [], [], []
+        self.best_round, best_mse = 0, float('inf')
+        for r in range(n_rounds):
+            np.subtract(y, F, out=residual)
+            #the residuals are the negative gradient of the squared error (up to a factor 2)
+            if subsample < 1: idxs = np.sort(rng.choice(n, max(int(subsample * n), 1), replace=False))
+            else: idxs = np.arange(n)
+            tree = DecisionTree(x, residual, idxs=idxs, min_leaf=min_leaf, max_depth=max_depth,
+                                hist_data=None if bins is None else hist_target(bins, residual), **tree_kwargs)
+            flat = tree.flatten()
+            self.trees.append(flat)
+
+            for leaf in self.leaves(tree):
+                F[leaf.idxs] += learning_rate * leaf.val
+            #the rows the tree was fitted on already know their leaf, no need to predict them again
+            if subsample < 1:
+                out_rows = np.nonzero(np.bincount(idxs, minlength=n) == 0)[0]
+                F[out_rows] += learning_rate * flat.predict(x[out_rows])
+            self.train_mse.append(np.mean((y - F) ** 2))
+
+            if has_valid:
+                F_valid += learning_rate * flat.predict(x_valid)
+                self.valid_mse.append(np.mean((y_valid - F_valid) ** 2))
+                if self.valid_mse[-1] < best_mse: self.best_round, best_mse = r + 1, self.valid_mse[-1]
+                elif r + 1 - self.best_round >= early_stopping_rounds: break
+            else: self.best_round = r + 1
+        self.trees = self.trees[:self.best_round]
+        #drop the rounds after the best validation score
+
+    @staticmethod
+    def leaves(tree):
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if node.is_leaf: yield node
+            else: stack += [node.rhs, node.lhs]
+
+    def __repr__(self):
+        return f'GradientBoosting(rounds: {len(self.trees)}; learning_rate: {self.learning_rate}; max_depth: {self.max_depth})'
+
+    def predict(self, x):
+        x = np.asarray(x, dtype=float)
+        preds = np.full(len(x), self.init_val)
+        for flat in self.trees:
+            preds += self.learning_rate * flat.predict(x)
+        return preds
+
+def grow_forest_tree(x, y, seed, settings):
+    #grows one tree of a RandomForest, returns it as a FlatTree with its out of bag rows and their predictions
+    rng = np.random.default_rng(seed)
+    idxs = rng.integers(0, len(y), len(y))
+    #the bootstrap sample, drawn with replacement
+    tree = DecisionTree(x, y, idxs=idxs, rng=rng, **settings)
+    oob_rows = np.nonzero(np.bincount(idxs, minlength=len(y)) == 0)[0]
+    flat = tree.flatten()
+    return flat, oob_rows, flat.predict(x[oob_rows])
+
+def forest_tree_job(seed, settings):
+    return grow_forest_tree(worker_data['x'], worker_data['y'], seed, settings)
+
+if __name__ == '__main__':
+    df=pd.read_csv('dataForDecisionTree.txt')
+    X=df.loc[:,['school','sex','age','address','absences']]
+    Y=np.asarray(df.G1+df.G2+df.G3)
+
+    X=pd.get_dummies(X, columns=['school','sex','address'],drop_first=True)
+
+    #print(X.shape) #(649, 5)
+    #print(Y.shape) #(649,)
+
+
+    #print(X)
+
+
+    PortionForTesting=0.2
+    curOff=int(PortionForTesting*len(df))
+
+    X_Test=X[:curOff]
+    Y_Test=Y[:curOff]
+
+    X_Train=X[curOff:]
+    Y_Train=Y[curOff:]
+
+    #print(len(X_Train))
+    #print(len(Y_Train))
+
+    #print(X_Test)
+    #print(X_Train)
+
+
+
+    MinLeaveList=list(range(51))
+    Max_DepthList=list(range(2,101))
+
+    OutSampleMAESurface = sweep_min_leaf_max_depth(X_Train, Y_Train, X_Test, Y_Test, MinLeaveList, Max_DepthList)
+    #OutSampleMAESurface[i, j] === the out of sample MAE of min_leaf=MinLeaveList[i] and max_depth=Max_DepthList[j]
+    #the combination of min_leaf and max_depth that generate the best out of sample prediction is the lowest point of the surface
+
+
+    # Plot the surface.
+    fig = plt.figure()
+    ax = fig.gca(projection='3d')
+    X = np.arange(0, 51)
+    Y = np.arange(2, 101)
+    X, Y = np.meshgrid(X, Y)
+    Z = OutSampleMAESurface.T
+    #the meshgrid is (max_depth, min_leaf) shaped, Z[j, i] === the MAE of max_depth=Max_DepthList[j] and min_leaf=MinLeaveList[i]
+
+
+    #print(X)
+    #print(X.shape)
+    #print(Y.shape)
+    #print(Z.shape)
+
+
+
+    surf = ax.plot_surface(X, Y, Z, cmap=cm.coolwarm,
+                           linewidth=0, antialiased=False)
+
+    # Add a color bar which maps values to colors.
+    fig.colorbar(surf, shrink=0.5, aspect=5)
+
+    ax.set_xlabel('Min_Leave_Sample')
+    ax.set_ylabel('Max_Depth')
+    ax.set_zlabel('Out_Sample_MAE')
+
+    plt.show()
+
+
+
+    del df
+
+
+
+
+    #['school;sex;age;address;famsize;Pstatus;Medu;Fedu;Mjob;Fjob;reason;guardian;traveltime;studytime;failures;schoolsup;famsup;paid;activities;nursery;higher;internet;romantic;famrel;freetime;goout;Dalc;Walc;health;absences;G1;G2;G3']
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio inference server for a trained NeuralNetwork.Network checkpoint.
+
+    python InferenceServer.py SkyNet.npy --port 8000
+    python InferenceServer.py SkyNet.npy --unix /tmp/skynet.sock
+
+Concurrent requests are queued and grouped into micro batches, each batch
+is a single predict_proba call. HTTP/1.1 with keep-alive:
+
+    POST /predict          {"pixels": [784 mapped pixels]}           -> {"digit": 7, "probabilities": [...]}
+                           {"instances": [[784 pixels], ...]}        -> {"digits": [...], "probabilities": [[...], ...]}
+    GET  /metrics          p50/p99 latency, throughput and batch sizes of the recent requests
+    POST /metrics/reset    starts the metrics over
+"""
+import argparse
+import asyncio
+import collections
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from NeuralNetwork import Network
+
+
+class MicroBatcher(object):
+#groups concurrent predict calls into micro batches for one network
+#a batch closes when it has max_batch_size rows or max_wait_ms after its first request arrived, whichever comes first,
+#then the whole batch is one predict_proba call on a worker thread (numpy releases the GIL in the matrix products),
+#so the event loop keeps accepting requests, which queue up for the next batch
+#max_batch_size=1 is the one predict per request baseline
+
+
+    def __init__(self, network, max_batch_size = 64, max_wait_ms = 2.0, metrics_window = 10_000):
+        self.network = network
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.metrics_window = metrics_window
+        self.queue = None
+        self.task = None
+        self.executor = None
+        self.pending = []
+        self.reset_metrics()
+
+    def start(self):
+        #starts the batching loop, must be called from the running event loop
+        #the queue and the worker thread are made here, so a stopped batcher can be started again
+        if self.task is None:
+            self.queue = asyncio.Queue()
+            self.executor = ThreadPoolExecutor(max_workers=1)
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        while not self.queue.empty():
+            self.pending.append(self.queue.get_nowait())
+        for rows, future, arrival in self.pending:
+            future.cancel() #the callers still waiting for a result, a done future ignores it
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+        #waits for the in-flight predict_proba on a helper thread, the event loop keeps serving meanwhile
+        self.task, self.queue, self.executor, self.pending = None, None, None, []
+
+    async def predict(self, rows):
+        #rows === (n x features), returns their (n x outputs) probabilities once the batch they joined is done
+        if self.task is None:
+            raise RuntimeError('call start() first')
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((rows, future, time.perf_counter()))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = self.pending = [await self.queue.get()]
+            #self.pending === the requests of the batch being collected or computed, stop() cancels them with the queued ones
+            numberOfRows = len(items[0][0])
+            deadline = loop.time()+self.max_wait_ms/1000
+            while numberOfRows < self.max_batch_size:
+                if self.queue.empty():
+                    timeout = deadline-loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self.queue.get_nowait()
+                items.append(item)
+                numberOfRows = numberOfRows+len(item[0])
+
+            X = items[0][0] if len(items) == 1 else np.concatenate([rows for rows, future, arrival in items])
+            try:
+                probabilities = await loop.run_in_executor(self.executor, self.network.predict_proba, X)
+            except Exception as error:
+                for rows, future, arrival in items:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+
+            done = time.perf_counter()
+            start = 0
+            for rows, future, arrival in items:
+                if not future.done(): #the caller may have gone away
+                    future.set_result(probabilities[start:start+len(rows)])
+                start = start+len(rows)
+                self.latencies.append(done-arrival)
+                self.completions.append(done)
+            self.batch_rows.append(numberOfRows)
+            self.requests = self.requests+len(items)
+            self.batches = self.batches+1
+
+    def reset_metrics(self):
+        self.latencies = collections.deque(maxlen=self.metrics_window) #seconds from arrival to result, recent requests
+        self.completions = collections.deque(maxlen=self.metrics_window) #when they were done
+        self.batch_rows = collections.deque(maxlen=self.metrics_window) #rows of the recent batches
+        self.requests = 0
+        self.batches = 0
+
+    def metrics(self):
+        #latency percentiles and throughput over the recent requests (at most metrics_window of them)
+        latencies = np.asarray(self.latencies)*1000
+        span = self.completions[-1]-self.completions[0] if len(self.completions) > 1 else 0.0
+        return dict(requests=self.requests, batches=self.batches,
+                    p50_ms=float(np.percentile(latencies, 50)) if len(latencies) else None,
+                    p99_ms=float(np.percentile(latencies, 99)) if len(latencies) else None,
+                    throughput_rps=(len(self.completions)-1)/span if span > 0 else None,
+                    mean_batch_rows=float(np.mean(self.batch_rows)) if self.batch_rows else None,
+                    max_batch_size=self.max_batch_size, max_wait_ms=self.max_wait_ms)
+
+
+class InferenceServer(object):
+#the HTTP front end of a MicroBatcher, over TCP or a Unix socket
+
+
+    def __init__(self, network, max_batch_size = 64, max_wait_ms = 2.0):
+        self.network = network
+        self.batcher = MicroBatcher(network, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    async def serve(self, host = '127.0.0.1', port = 8000, unix_path = None):
+        #serves until cancelled
+        self.batcher.start()
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle, unix_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+    async def handle(self, reader, writer):
+        #one connection, any number of requests (keep-alive)
+        try:
+            while True:
+                requestLine = await reader.readline()
+                if not requestLine:
+                    break
+                try:
+                    method, target, headers = await self.read_head(requestLine, reader)
+                    length = int(headers.get('content-length', 0))
+                    if length < 0:
+                        raise ValueError(f'bad Content-Length {length}')
+                except ValueError as error:
+                    #a malformed request line or header, answer it and close since the rest of the stream can't be trusted
+                    await self.respond(writer, 400, dict(error=f'malformed request: {error}'), close=True)
+                    break
+                body = await reader.readexactly(length)
+
+                status, payload = await self.route(method, target, body)
+                close = headers.get('connection', '').lower() == 'close'
+                await self.respond(writer, status, payload, close=close)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass #the client already went away
+
+    @staticmethod
+    async def read_head(requestLine, reader):
+        #the method, target and headers of one request, ValueError when the request line or a header is malformed
+        parts = requestLine.decode('latin-1').split()
+        if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+            raise ValueError(f'bad request line {requestLine[:100]!r}')
+        method, target, version = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if b':' not in line:
+                raise ValueError(f'bad header {line[:100]!r}')
+            key, value = line.decode('latin-1').split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+        return method, target, headers
+
+    @staticmethod
+    async def respond(writer, status, payload, close = False):
+        data = json.dumps(payload).encode()
+        writer.write(b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n%s\r\n'
+                     % (status, {200: b'OK', 400: b'Bad Request', 404: b'Not Found', 500: b'Internal Server Error'}[status], len(data),
+                        b'Connection: close\r\n' if close else b'') + data)
+        await writer.drain()
+
+    async def route(self, method, target, body):
+        if method == 'POST' and target == '/predict':
+            try:
+                request = json.loads(body)
+                single = 'pixels' in request
+                rows = np.asarray([request['pixels']] if single else request['instances'], dtype=self.network.dtype)
+            except (ValueError, KeyError, TypeError):
+                return 400, dict(error='the body must be {"pixels": [...]} or {"instances": [[...], ...]}')
+            if rows.ndim != 2 or rows.shape[1] != self.network.sizes[0] or len(rows) == 0:
+                return 400, dict(error=f'every instance must have {self.network.sizes[0]} pixels')
+            if not np.all(np.isfinite(rows)):
+                return 400, dict(error='the pixels must be finite numbers') #json.loads accepts NaN and Infinity
+            probabilities = await self.batcher.predict(rows)
+            if not np.all(np.isfinite(probabilities)):
+                return 500, dict(error='the network produced non-finite probabilities') #json.dumps would write them as NaN, which is not JSON
+            if single:
+                return 200, dict(digit=int(np.argmax(probabilities[0])), probabilities=probabilities[0].tolist())
+            return 200, dict(digits=np.argmax(probabilities, axis=1).tolist(), probabilities=probabilities.tolist())
+        if method == 'GET' and target == '/metrics':
+            return 200, self.batcher.metrics()
+        if method == 'POST' and target == '/metrics/reset':
+            self.batcher.reset_metrics()
+            return 200, {}
+        return 404, dict(error=f'no route {method} {target}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='serve a NeuralNetwork.Network checkpoint (Network.save) over HTTP')
+    parser.add_argument('checkpoint')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--unix', help='serve on this Unix socket path instead of host:port')
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    server = InferenceServer(Network.load(args.checkpoint), max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    print(f"serving {args.checkpoint} on {args.unix or f'{args.host}:{args.port}'}", flush=True)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
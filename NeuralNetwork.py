@@ -1,277 +1,1002 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Sun Nov 22 11:56:36 2020
-
-@author: Yaokun Lin
-"""
-import pandas as pd
-import numpy as np
-import random
-
-
-
-class Network(object):
-#eg. net = Network([2, 3, 1]) 
-#represents a three layers network
-#where the first layer to be the input layer with two neurons, 
-#the input layer does not have weights and biases
-#the 2nd layer is the hidden layer which has 3 neurons
-#the 3rd layer is the output layer which has only 1 neuron
-
-
-    def __init__(self, sizes, activation_function = 'sigmoid', learning_rate = .05, required_training_accuracy = 0.97, mini_batch_size=10):
-        self.num_layers = len(sizes)
-        self.sizes = sizes
-        self.biases = [np.random.randn(y, 1) for y in sizes[1:]]
-        #one bias for each of the nerons in the hidden layers and the output layer 
-        #np.random.randn generates standard normal random variables
-        #which provide starting points for the biases
-        self.weights = [np.random.randn(y, x) 
-                        for x, y in zip(sizes[:-1], sizes[1:])]
-        #weights are applied between the input layer to the 1st hidden layer
-        #applied between each of the hidden layers
-        #applied between the final hidden layer to the the output layer 
-        #np.random.randn generates standard normal random variables
-        #which provide starting points for the weights
-        self.activation_function = activation_function
-        #default = "sigmoid", options include "softplus" and "ReLu"
-        self.learning_rate=learning_rate
-        self.required_training_accuracy = required_training_accuracy #Allows the algorithm go through epoches until it reaches the required level of accuracy
-        self.mini_batch_size=mini_batch_size
-        self.mini_step_rate = self.learning_rate / self.mini_batch_size
-    
-    
-    def train(self, X,Y):
-             
-        ithEpoch = 1
-        inSampleAccuracy = 0.00
-        while inSampleAccuracy < self.required_training_accuracy:
-            
-            shuffledIndexs = np.asarray(range(0,len(X),1))
-            random.shuffle(shuffledIndexs)
-            numberOfCorrectForEachEpoch = 0
-                     
-            for kthMiniBatch in range(0, len(X), self.mini_batch_size):
-                for index in shuffledIndexs[kthMiniBatch : kthMiniBatch+self.mini_batch_size]:
-                  #  print(index)
-                    
-                    #gradien decent and backpropagation
-                    self.backpropagation(X=X[index],
-                                    Y=Y[index])
-                    
-                    
-                    #in sample prediction, fitting evluation starts
-                    IsCorrect = self.InSampleFittingEvaluator(X=X[index],
-                                    Y=Y[index])                
-                    
-                    if IsCorrect:
-                        numberOfCorrectForEachEpoch = numberOfCorrectForEachEpoch+1
-                    #in sample prediction, fitting evluation ends
-                                                                                       
-            
-            inSampleAccuracy = numberOfCorrectForEachEpoch/len(X)
-            print(f"Epoch {ithEpoch}: {numberOfCorrectForEachEpoch} / {len(X)}, insample acc. {inSampleAccuracy*100:.2f}% ")
-                     
-            ithEpoch=ithEpoch+1
-            
-        print(f"Training completed, {ithEpoch-1} epochs were run, the current learning accuracy:{inSampleAccuracy*100:.2f}% higher than the required accuracy:{self.required_training_accuracy*100:.2f}%")
-         
-    def backpropagation(self,X,Y):
-        
-        zs,activations=self.feedforward(X)
-               
-        ##Backward passing Starts
-        yOne = Y.reshape((len(Y),1))                
-        
-        SSEPrimeOne = self.cost_derivative(activations[-1],yOne)            
-        
-        sigmoidPrimeOne = self.sigmoid_prime(zs[-1])
-        
-        #delta = SSEPrimeOne*sigmoidPrimeOne
-        
-        LastBiasGradient = SSEPrimeOne*sigmoidPrimeOne
-        
-        LastWeightGradient=np.dot(LastBiasGradient, activations[-2].transpose())
-        
-        ###Updating the weights and biases in the very last layer 
-        self.weights[-1] = np.add(self.weights[-1],-1 * self.mini_step_rate*LastWeightGradient)  
-        self.biases[-1] = np.add(self.biases[-1],-1 * self.mini_step_rate*LastBiasGradient) 
-                       
-        
-        ###Updating the weights and biases in the 2nd last layer To the 2nd layer 
-        nthLastLayer = -2 #-2 indicates the 2nd last layer
-        nthLastLayerBiasGradient = LastBiasGradient
-        while nthLastLayer != -(self.num_layers-1):
-            
-            #gradient decent
-            nthLastLayerBiasGradient = np.dot(self.weights[nthLastLayer+1].transpose(),nthLastLayerBiasGradient)
-            nthLastLayerBiasGradient=nthLastLayerBiasGradient*self.sigmoid_prime(zs[nthLastLayer])
-                       
-            nthLastWeightGradient = np.dot(nthLastLayerBiasGradient,activations[nthLastLayer-1].transpose())
-            
-            
-            self.biases[nthLastLayer] = np.add(self.biases[nthLastLayer],-1 * self.mini_step_rate*nthLastLayerBiasGradient)
-            self.weights[nthLastLayer] = np.add(self.weights[nthLastLayer],-1 * self.mini_step_rate*nthLastWeightGradient)
-            
-            nthLastLayer = nthLastLayer-1 #Move Backward through Layers
-                                   
-        ###Updating the weights and biases in the 1st layer
-        FirstBiasGradient = np.dot(self.weights[1].transpose(),nthLastLayerBiasGradient)
-        FirstBiasGradient=FirstBiasGradient*self.sigmoid_prime(zs[0])
-               
-        FirstWeightGradient= np.dot(FirstBiasGradient,X.reshape((len(X),1)).transpose())
-        
-        self.biases[0] = np.add(self.biases[0],-1 * self.mini_step_rate*FirstBiasGradient) # updating the last layer
-        self.weights[0] = np.add(self.weights[0],-1 * self.mini_step_rate*FirstWeightGradient) # updating the last layer
-        ##Backward passing Ends
-        
-        
-        return activations[-1]
-        
-        
-    
-    def softplus(self,z): #softplus(also called logistic) activation function
-        return np.log(1.0+np.exp(z))
-    
-    def ReLu(self,z): #ReLu bent line activation function
-        return np.max(0,z)                     
-        
-    def sigmoid(self,z): #sigmoid activation function
-        return 1.0/(1.0+np.exp(-z))
-    
-    def sigmoid_prime(self,z):
-        """Derivative of the sigmoid function."""
-        return self.sigmoid(z)*(1-self.sigmoid(z))
-    
-    def cost_derivative(self, output_activations, y):
-        """Return the vector of partial derivatives \partial C_x /
-        \partial a for the output activations."""
-        return 2*(output_activations-y)
-    
-    def feedforward(self, X):
-        """Return the output of the network if "a" is input."""
-        # for b, w in zip(self.biases, self.weights):
-        #     if self.activation_function == 'softplus':
-        #         a = self.softplus(np.dot(w, a)+b)
-        #     elif self.activation_function == 'ReLu':
-        #         a = self.ReLu(np.dot(w, a)+b)
-        #     else:
-        #         a= self.sigmoid(np.dot(w, a)+b)
-        
-        ##Feedforward Starts
-        ###Feedforward in the 1st layer
-        z=np.dot(self.weights[0],X)
-        z=z.reshape((len(z),1))
-        z = np.add(z,self.biases[0])
-        activation = self.sigmoid(z)
-        
-        
-        activations = [activation] # list to store all the activations, layer by layer
-        zs = [z] # list to store all the z vectors, layer by layer
-        
-        
-        ###Feedforward in the 2nd layer to the last layer
-        nthLayer = 1 
-        while nthLayer < self.num_layers-1:
-         
-            z = np.dot(self.weights[nthLayer],activation)        
-            z = np.add(z,self.biases[nthLayer])
-          
-            zs.append(z)
-                   
-            activation=self.sigmoid(z)           
-            activations.append(activation)
-            
-            nthLayer=nthLayer+1
-        ##Feedforward Ends
-        return zs,activations
-    
-    def InSampleFittingEvaluator(self, X, Y): 
-        finalOutputZs,finalOutpuActivations=self.feedforward(X=X)
-        
-        xInSamplePredicted = np.argmax(finalOutpuActivations[-1])     
-        yLable = np.argmax(Y)
-        
-        return xInSamplePredicted == yLable
-    
-    def predict(self,X, IsReturnPredictionPbty = True):
-        predicted_zs,predicted_activations = self.feedforward(X)
-        
-        if IsReturnPredictionPbty:
-            self.PrintPredictionPbty(predicted_activations[-1])
-          
-        return np.argmax(predicted_activations[-1])
-    
-     
-    def PrintPredictionPbty(self,FinalActivationArray):
-        FinalActivationList = list(FinalActivationArray)
-        totalSum = np.sum(FinalActivationArray)
-        
-        for num in FinalActivationList:
-           
-            pbty = str(round(float(num/totalSum*100),2))+"%"
-            print(f"number {FinalActivationList.index(num)}'s pred. pbty:{pbty}")
-        
-        print(' ')
-        
-    
-    
-#Loading training data starts
-df=pd.read_csv('mnist_train.csv')
-#The images of the MNIST dataset are greyscale and the pixels range between 0 and 255 including both bounding values. 
-#We will map these values into an interval from [0.01, 1] by multiplying each pixel by 0.99 / 255 and 
-#adding 0.01 to the result. This way, we avoid 0 values as inputs, which are capable of preventing weight updates
-x_train = np.asfarray(df.loc[:,(df.columns != 'label')])*0.99 / 255+.01
-y_train = np.asfarray(df.loc[:,(df.columns == 'label')])
-del df
-
-#We need the labels in our calculations in a one-hot representation. 
-lr = np.arange(10)
-for label in range(10):
-    one_hot = ((np.arange(10))==label).astype(np.int)
-    print("label: ", label, " in one-hot representation: ", one_hot)
-del one_hot,label
-
-#easier to calculate 0.01 and 0.99
-y_train = (y_train==lr).astype(np.float)
-y_train[y_train ==1] = 0.99
-y_train[y_train ==0] = 0.01
-
-#Training the model
-#SkyNet = Network([784,25,30, 10],activation_function='sigmoid', learning_rate = 5, epochs = 25, mini_batch_size=10)
-SkyNet = Network([784,25,30, 10],activation_function='sigmoid', learning_rate = 5, required_training_accuracy = 0.95, mini_batch_size=10)
-SkyNet.train(X=x_train,Y=y_train)
-#del x_train,y_train
-
-
-
-#Loading testing data
-df=pd.read_csv('mnist_test.csv')
-x_test = np.asfarray(df.loc[:,(df.columns != 'label')])*0.99 / 255+.01
-# y_test = np.asfarray(df.loc[:,(df.columns == 'label')])
-#del df
-
-# y_test = (y_test==lr).astype(np.float)
-# y_test[y_test ==1] = 0.99
-# y_test[y_test ==0] = 0.01
-del lr
-
-#Select an out sample handwritten digit to predict
-selected_OutSample_X = x_test[102]
-
-#show imagine Example on a plot
-import matplotlib.pyplot as plt
-img = selected_OutSample_X.reshape((28,28))
-plt.imshow(img, cmap="Greys")    
-plt.show()    
-del img
-
-#use neural network to make prediction
-
-print(SkyNet.predict(selected_OutSample_X,IsReturnPredictionPbty = True))
-print("IS THE PREDICTED OUT_SAMPLE_X BASED ON above PROBABILITIES")
-
-
-
-
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Nov 22 11:56:36 2020
+
+@author: Yaokun Lin
+"""
+import pandas as pd
+import numpy as np
+import random
+import copy
+import json
+import math
+import multiprocessing
+import os
+import threading
+import time
+
+from SharedArrays import attach_array, share_array
+
+
+
+class Network(object):
+#eg. net = Network([2, 3, 1]) 
+#represents a three layers network
+#where the first layer to be the input layer with two neurons, 
+#the input layer does not have weights and biases
+#the 2nd layer is the hidden layer which has 3 neurons
+#the 3rd layer is the output layer which has only 1 neuron
+
+
+    def __init__(self, sizes, activation_function = 'sigmoid', learning_rate = .05, required_training_accuracy = 0.97, mini_batch_size=10, dtype = np.float64,
+                 optimizer = 'sgd', lr_schedule = None):
+        self.num_layers = len(sizes)
+        self.sizes = sizes
+        self.dtype = np.dtype(dtype)
+        #float64 by default, np.float32 halves the memory traffic of the batched training
+        self.biases = [np.random.randn(y, 1).astype(self.dtype) for y in sizes[1:]]
+        #one bias for each of the nerons in the hidden layers and the output layer 
+        #np.random.randn generates standard normal random variables
+        #which provide starting points for the biases
+        self.weights = [np.random.randn(y, x).astype(self.dtype) 
+                        for x, y in zip(sizes[:-1], sizes[1:])]
+        #weights are applied between the input layer to the 1st hidden layer
+        #applied between each of the hidden layers
+        #applied between the final hidden layer to the the output layer 
+        #np.random.randn generates standard normal random variables
+        #which provide starting points for the weights
+        if activation_function not in ('sigmoid', 'softplus', 'ReLu'):
+            raise ValueError(f"activation_function must be 'sigmoid', 'softplus' or 'ReLu', got {activation_function!r}")
+        self.activation_function = activation_function
+        #default = "sigmoid", options include "softplus" and "ReLu", used by every layer
+        self.learning_rate=learning_rate
+        self.optimizer = make_optimizer(optimizer)
+        #'sgd', 'momentum', 'nesterov', 'adam' or an optimizer object (SGD, Momentum, Adam), used by the batched training
+        self.lr_schedule = lr_schedule
+        #None (constant learning rate) or StepDecay, CosineDecay, Warmup, any function of the epoch giving the learning rate multiplier
+        self.epochs_trained = 0 #fractional epochs feed the lr_schedule
+        self.required_training_accuracy = required_training_accuracy #Allows the algorithm go through epoches until it reaches the required level of accuracy
+        self.mini_batch_size=mini_batch_size
+        self.mini_step_rate = self.learning_rate / self.mini_batch_size
+        self.engine = None #TrainingEngine with the preallocated buffers of the batched training, built on first use
+        self.stats = None #net.stats = NetworkStats(net.sizes) times the training, see NetworkStats
+    
+    
+    def train(self, X,Y, batched = True, workers = 1, hogwild = False, mp_context = None, max_epochs = None, max_seconds = None):
+        #batched=True pushes every mini batch through the network as one matrix, see TrainingEngine
+        #batched=False is the sample by sample path, which updates the weights after every sample with plain SGD and a constant rate
+        #batched=True is the default, which changes the convergence of the existing callers: one batched step averages the gradients of
+        #mini_batch_size samples where the sample by sample path takes mini_batch_size steps, so at the same learning_rate it needs
+        #more (but much cheaper) epochs, e.g. ~18 instead of 1-2 for the script's MNIST network at learning_rate=5;
+        #give it a max_epochs/max_seconds budget, or pass batched=False to keep the old per-epoch behavior
+        #workers>1 trains data parallel on that many processes, see DataParallelTrainer (hogwild=True for the lock-free mode), which is always batched
+        #max_epochs and max_seconds stop the training before the required accuracy is reached, the time is checked between epochs
+        #returns the in-sample accuracy of the last epoch
+        
+        if workers > 1 and not batched:
+            raise ValueError("workers > 1 trains batched, the sample by sample path (batched=False) only runs on one worker")
+        if batched:
+            X = np.asarray(X, dtype=self.dtype) #cast once, not every epoch
+            Y = np.asarray(Y, dtype=self.dtype)
+        trainer = DataParallelTrainer(self, X, Y, workers=workers, hogwild=hogwild, mp_context=mp_context) if workers > 1 else None
+             
+        ithEpoch = 1
+        inSampleAccuracy = 0.00
+        startTime = time.perf_counter()
+        try:
+            while inSampleAccuracy < self.required_training_accuracy:
+                if max_epochs is not None and ithEpoch > max_epochs:
+                    break
+                if max_seconds is not None and time.perf_counter()-startTime >= max_seconds:
+                    break
+                
+                if trainer is None:
+                    numberOfCorrectForEachEpoch = self.train_epoch(X=X, Y=Y, batched=batched)
+                else:
+                    epochStartTime = time.perf_counter()
+                    numberOfCorrectForEachEpoch = trainer.train_epoch()
+                    if self.stats is not None:
+                        self.stats.add_epoch(len(X), time.perf_counter()-epochStartTime)
+                                                                                           
+                
+                inSampleAccuracy = numberOfCorrectForEachEpoch/len(X)
+                speed = f", {self.stats.last_samples_per_second:,.0f} samples/s" if self.stats is not None else ""
+                print(f"Epoch {ithEpoch}: {numberOfCorrectForEachEpoch} / {len(X)}, insample acc. {inSampleAccuracy*100:.2f}%{speed} ")
+                         
+                ithEpoch=ithEpoch+1
+        finally:
+            if trainer is not None:
+                trainer.close()
+            
+        if inSampleAccuracy >= self.required_training_accuracy:
+            print(f"Training completed, {ithEpoch-1} epochs were run, the current learning accuracy:{inSampleAccuracy*100:.2f}% higher than the required accuracy:{self.required_training_accuracy*100:.2f}%")
+        else:
+            print(f"Training stopped by the budget after {ithEpoch-1} epochs and {time.perf_counter()-startTime:.1f} s, the current learning accuracy:{inSampleAccuracy*100:.2f}% lower than the required accuracy:{self.required_training_accuracy*100:.2f}%")
+        return inSampleAccuracy
+    
+    def train_epoch(self, X,Y, batched = True):
+        #one pass over X in shuffled mini batches, returns the number of correctly fitted samples
+        
+        shuffledIndexs = np.asarray(range(0,len(X),1))
+        random.shuffle(shuffledIndexs)
+        numberOfCorrectForEachEpoch = 0
+        epochStartTime = time.perf_counter()
+                 
+        if batched:
+            numberOfCorrectForEachEpoch = self.training_engine().train_epoch(X=X, Y=Y, order=shuffledIndexs)
+            self.epochs_trained = self.epochs_trained+1
+            if self.stats is not None:
+                self.stats.add_epoch(len(X), time.perf_counter()-epochStartTime)
+            return numberOfCorrectForEachEpoch
+                 
+        for kthMiniBatch in range(0, len(X), self.mini_batch_size):
+            for index in shuffledIndexs[kthMiniBatch : kthMiniBatch+self.mini_batch_size]:
+              #  print(index)
+                
+                #gradien decent and backpropagation
+                finalActivation = self.backpropagation(X=X[index],
+                                Y=Y[index])
+                
+                
+                #in sample prediction, fitting evluation starts
+                #the output of backpropagation's own forward pass, no second feedforward
+                IsCorrect = np.argmax(finalActivation) == np.argmax(Y[index])
+                
+                if IsCorrect:
+                    numberOfCorrectForEachEpoch = numberOfCorrectForEachEpoch+1
+                #in sample prediction, fitting evluation ends
+        
+        self.epochs_trained = self.epochs_trained+1
+        if self.stats is not None:
+            self.stats.add_epoch(len(X), time.perf_counter()-epochStartTime)
+        return numberOfCorrectForEachEpoch
+
+    def backpropagation(self,X,Y):
+        
+        zs,activations=self.feedforward(X)
+               
+        ##Backward passing Starts
+        yOne = Y.reshape((len(Y),1))                
+        
+        SSEPrimeOne = self.cost_derivative(activations[-1],yOne)            
+        
+        activationPrimeOne = self.activation_prime(activations[-1])
+        
+        #delta = SSEPrimeOne*activationPrimeOne
+        
+        LastBiasGradient = SSEPrimeOne*activationPrimeOne
+        
+        LastWeightGradient=np.dot(LastBiasGradient, activations[-2].transpose())
+        
+        ###Updating the weights and biases in the very last layer 
+        self.weights[-1] = np.add(self.weights[-1],-1 * self.mini_step_rate*LastWeightGradient)  
+        self.biases[-1] = np.add(self.biases[-1],-1 * self.mini_step_rate*LastBiasGradient) 
+                       
+        
+        ###Updating the weights and biases in the 2nd last layer To the 2nd layer 
+        nthLastLayer = -2 #-2 indicates the 2nd last layer
+        nthLastLayerBiasGradient = LastBiasGradient
+        while nthLastLayer != -(self.num_layers-1):
+            
+            #gradient decent
+            nthLastLayerBiasGradient = np.dot(self.weights[nthLastLayer+1].transpose(),nthLastLayerBiasGradient)
+            nthLastLayerBiasGradient=nthLastLayerBiasGradient*self.activation_prime(activations[nthLastLayer])
+                       
+            nthLastWeightGradient = np.dot(nthLastLayerBiasGradient,activations[nthLastLayer-1].transpose())
+            
+            
+            self.biases[nthLastLayer] = np.add(self.biases[nthLastLayer],-1 * self.mini_step_rate*nthLastLayerBiasGradient)
+            self.weights[nthLastLayer] = np.add(self.weights[nthLastLayer],-1 * self.mini_step_rate*nthLastWeightGradient)
+            
+            nthLastLayer = nthLastLayer-1 #Move Backward through Layers
+                                   
+        ###Updating the weights and biases in the 1st layer
+        FirstBiasGradient = np.dot(self.weights[1].transpose(),nthLastLayerBiasGradient)
+        FirstBiasGradient=FirstBiasGradient*self.activation_prime(activations[0])
+               
+        FirstWeightGradient= np.dot(FirstBiasGradient,X.reshape((len(X),1)).transpose())
+        
+        self.biases[0] = np.add(self.biases[0],-1 * self.mini_step_rate*FirstBiasGradient) # updating the last layer
+        self.weights[0] = np.add(self.weights[0],-1 * self.mini_step_rate*FirstWeightGradient) # updating the last layer
+        ##Backward passing Ends
+        
+        
+        return activations[-1]
+    
+    def parameter_arrays(self):
+        #the weights and biases layer by layer, [w0, b0, w1, b1, ...], the order optimizers get them in
+        return [parameter for w, b in zip(self.weights, self.biases) for parameter in (w, b)]
+    
+    def learning_rate_at(self, epoch):
+        #the learning rate after epoch (fractional) epochs of training
+        if self.lr_schedule is None:
+            return self.learning_rate
+        return self.learning_rate*self.lr_schedule(epoch)
+    
+    def training_engine(self):
+        if self.engine is None or self.engine.batchSize != self.mini_batch_size:
+            self.engine = TrainingEngine(self)
+        return self.engine
+    
+    def backpropagation_batch(self,X,Y):
+        #X === (features x batch) matrix with one sample per column
+        #Y === (outputs x batch) matrix of one-hot targets
+        #the gradients of all the samples are summed by the matrix products, averaged and applied once per batch
+        #the plain numpy version of TrainingEngine.step, which gives the same updates without allocating
+        
+        zs,activations=self.feedforward(X)
+        batchStepRate = self.learning_rate / X.shape[1]
+        
+        ##Backward passing Starts
+        delta = self.cost_derivative(activations[-1],Y)*self.activation_prime(activations[-1])
+        
+        biasGradients = [None]*(self.num_layers-1)
+        weightGradients = [None]*(self.num_layers-1)
+        nthLayer = self.num_layers-2 #the last layer which has weights
+        while nthLayer >= 0:
+            
+            previousActivation = activations[nthLayer-1] if nthLayer > 0 else X
+            biasGradients[nthLayer] = delta.sum(axis=1, keepdims=True)
+            weightGradients[nthLayer] = np.dot(delta, previousActivation.transpose())
+            
+            if nthLayer > 0:
+                #uses the weights before this batch's update, all the gradients belong to the same weights
+                delta = np.dot(self.weights[nthLayer].transpose(),delta)*self.activation_prime(activations[nthLayer-1])
+            
+            nthLayer = nthLayer-1 #Move Backward through Layers
+        
+        ###Updating all the weights and biases once for the whole batch
+        for nthLayer in range(self.num_layers-1):
+            self.biases[nthLayer] = np.add(self.biases[nthLayer],-1 * batchStepRate*biasGradients[nthLayer])
+            self.weights[nthLayer] = np.add(self.weights[nthLayer],-1 * batchStepRate*weightGradients[nthLayer])
+        ##Backward passing Ends
+        
+        return activations[-1]
+        
+        
+    
+    def softplus(self,z): #softplus(also called logistic) activation function
+        return np.logaddexp(0.0,z) #log(1+exp(z)) without overflowing for large z
+    
+    def ReLu(self,z): #ReLu bent line activation function
+        return np.maximum(0,z)                     
+    
+    def activation(self,z): #the activation_function of the network
+        if self.activation_function == 'softplus':
+            return self.softplus(z)
+        elif self.activation_function == 'ReLu':
+            return self.ReLu(z)
+        return self.sigmoid(z)
+    
+    def activation_prime(self,activation):
+        #derivative of the activation_function, from the activation a it gave:
+        #sigmoid a*(1-a), softplus sigmoid(z) = 1-exp(-a), ReLu 1 where a > 0
+        if self.activation_function == 'softplus':
+            return 1-np.exp(-activation)
+        elif self.activation_function == 'ReLu':
+            return (activation > 0).astype(activation.dtype)
+        return activation*(1-activation)
+        
+    def sigmoid(self,z): #sigmoid activation function
+        return 1.0/(1.0+np.exp(-z))
+    
+    def sigmoid_prime(self,z):
+        """Derivative of the sigmoid function."""
+        sigmoidZ = self.sigmoid(z)
+        return sigmoidZ*(1-sigmoidZ)
+    
+    def cost_derivative(self, output_activations, y):
+        """Return the vector of partial derivatives \partial C_x /
+        \partial a for the output activations."""
+        return 2*(output_activations-y)
+    
+    def feedforward(self, X):
+        """Return the zs and activations of every layer for the input X.
+
+        X is either one sample (a 1-D array) or a (features x batch) matrix
+        with one sample per column, the activations then have one column per sample."""
+        ##Feedforward Starts
+        ###Feedforward in the 1st layer
+        if X.ndim == 1:
+            X = X.reshape((len(X),1))
+        z=np.dot(self.weights[0],X)
+        z = np.add(z,self.biases[0])
+        activation = self.activation(z)
+        
+        
+        activations = [activation] # list to store all the activations, layer by layer
+        zs = [z] # list to store all the z vectors, layer by layer
+        
+        
+        ###Feedforward in the 2nd layer to the last layer
+        nthLayer = 1 
+        while nthLayer < self.num_layers-1:
+         
+            z = np.dot(self.weights[nthLayer],activation)        
+            z = np.add(z,self.biases[nthLayer])
+          
+            zs.append(z)
+                   
+            activation=self.activation(z)           
+            activations.append(activation)
+            
+            nthLayer=nthLayer+1
+        ##Feedforward Ends
+        return zs,activations
+    
+    def InSampleFittingEvaluator(self, X, Y): 
+        #number of correct predictions, X and Y are one sample or one sample per column
+        finalOutputZs,finalOutpuActivations=self.feedforward(X=X)
+        
+        xInSamplePredicted = np.argmax(finalOutpuActivations[-1], axis=0)     
+        yLable = np.argmax(Y, axis=0)
+        
+        return int(np.sum(xInSamplePredicted == yLable))
+    
+    def predict(self,X, IsReturnPredictionPbty = True):
+        predicted_zs,predicted_activations = self.feedforward(X)
+        
+        if IsReturnPredictionPbty:
+            self.PrintPredictionPbty(predicted_activations[-1])
+          
+        return np.argmax(predicted_activations[-1])
+    
+    def output_batch(self, X, chunk_size = 1024):
+        #X === (samples x features), returns the (samples x outputs) final activations
+        #each chunk of samples is one feedforward of a (features x chunk) matrix
+        X = np.asarray(X)
+        finalActivations = np.empty((len(X), self.sizes[-1]), dtype=np.result_type(X.dtype, self.dtype))
+        for start in range(0, len(X), chunk_size):
+            chunkZs,chunkActivations = self.feedforward(X[start:start+chunk_size].transpose())
+            finalActivations[start:start+chunk_size] = chunkActivations[-1].transpose()
+        return finalActivations
+    
+    def predict_batch(self, X, chunk_size = 1024):
+        #predicted digit of every row of X
+        return np.argmax(self.output_batch(X, chunk_size), axis=1)
+    
+    def predict_proba(self, X, chunk_size = 1024):
+        #every row of X's output activations scaled to sum to 1, the probabilities PrintPredictionPbty prints
+        #a row whose activations are all 0 (e.g. every ReLu output is off) gets the uniform probabilities instead of 0/0 = nan
+        finalActivations = self.output_batch(X, chunk_size)
+        rowSums = finalActivations.sum(axis=1, keepdims=True)
+        return np.divide(finalActivations, rowSums, out=np.full_like(finalActivations, 1/self.sizes[-1]), where=rowSums > 0)
+    
+    def evaluate(self, X, Y, chunk_size = 1024):
+        #accuracy over all the rows of X, Y === one-hot rows like the training targets or the labels themselves
+        Y = np.asarray(Y)
+        yLables = np.argmax(Y, axis=1) if Y.ndim == 2 else Y
+        return float(np.mean(self.predict_batch(X, chunk_size) == yLables))
+    
+     
+    def PrintPredictionPbty(self,FinalActivationArray):
+        FinalActivationArray = np.ravel(FinalActivationArray)
+        totalSum = np.sum(FinalActivationArray)
+        
+        for number, num in enumerate(FinalActivationArray):
+           
+            pbty = str(round(float(num/totalSum*100),2))+"%"
+            print(f"number {number}'s pred. pbty:{pbty}")
+        
+        print(' ')
+    
+    def save(self, path):
+        #checkpoint: the weights and biases as one flat .npy vector at path (see parameter_views), the settings in path+'.json'
+        #both files are written under a temporary name first, so a crash never leaves half a checkpoint
+        parameters = np.concatenate([np.concatenate([w.ravel(), b.ravel()]) for w, b in zip(self.weights, self.biases)])
+        settings = dict(sizes=[int(size) for size in self.sizes], activation_function=self.activation_function,
+                        learning_rate=self.learning_rate, required_training_accuracy=self.required_training_accuracy,
+                        mini_batch_size=self.mini_batch_size, dtype=self.dtype.str)
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, parameters.astype(self.dtype, copy=False))
+        with open(path + '.json.tmp', 'w') as f:
+            json.dump(settings, f)
+        os.replace(path + '.tmp', path)
+        os.replace(path + '.json.tmp', path + '.json')
+    
+    @classmethod
+    def load(cls, path, mmap_mode = 'c'):
+        #the Network a save call wrote, its weights and biases are views into the memory-mapped checkpoint,
+        #so loading does not read the file and processes that load the same checkpoint share its pages
+        #mmap_mode='c' (copy on write) lets the loaded network train without changing the file, 'r' is read-only, None reads it into memory
+        with open(path + '.json') as f:
+            settings = json.load(f)
+        parameters = np.load(path, mmap_mode=mmap_mode)
+        if parameters.shape != (parameter_count(settings['sizes']),):
+            raise ValueError(f"{path} has {parameters.size} parameters, sizes {settings['sizes']} need {parameter_count(settings['sizes'])}")
+        net = cls(settings['sizes'], activation_function=settings['activation_function'], learning_rate=settings['learning_rate'],
+                  required_training_accuracy=settings['required_training_accuracy'], mini_batch_size=settings['mini_batch_size'],
+                  dtype=settings['dtype'])
+        net.weights, net.biases = parameter_views(net.sizes, parameters)
+        return net
+        
+    
+    
+class TrainingEngine(object):
+#the batched training step of a Network without allocating arrays inside the training loop
+#eg. TrainingEngine(net).train_epoch(X, Y, order) runs one epoch over the rows of X in the given order
+#every z, activation, delta and gradient buffer is allocated once per layer for mini_batch_size samples,
+#the weights and biases are updated in place by the network's optimizer
+#and the activation function's derivative comes from the stored activations, e.g. a*(1-a) for the sigmoid, instead of evaluating it again
+#the buffers hold one sample per row (batch x layer size), so the shorter last batch is just the first rows
+#and every np.dot can write straight into a contiguous buffer
+
+
+    def __init__(self, network, gradients = None):
+        #gradients === optional flat vector of parameter_count(network.sizes) to hold the gradient buffers, e.g. in shared memory
+        self.network = network
+        self.dtype = network.dtype
+        self.batchSize = network.mini_batch_size
+        layerSizes = network.sizes[1:]
+        
+        self.XBatch = np.empty((self.batchSize, network.sizes[0]), dtype=self.dtype)
+        self.YBatch = np.empty((self.batchSize, network.sizes[-1]), dtype=self.dtype)
+        self.zs = [np.empty((self.batchSize, size), dtype=self.dtype) for size in layerSizes]
+        self.activations = [np.empty((self.batchSize, size), dtype=self.dtype) for size in layerSizes]
+        self.deltas = [np.empty((self.batchSize, size), dtype=self.dtype) for size in layerSizes]
+        self.primes = [np.empty((self.batchSize, size), dtype=self.dtype) for size in layerSizes] #activation derivatives
+        self.biasRows = [np.empty((self.batchSize, size), dtype=self.dtype) for size in layerSizes]
+        #the biases copied to every row, a broadcasting np.add would allocate a buffer of the whole batch
+        self.gradients = np.empty(parameter_count(network.sizes), dtype=self.dtype) if gradients is None else gradients
+        self.weightGradients, biasGradients = parameter_views(network.sizes, self.gradients)
+        self.biasGradients = [b[:, 0] for b in biasGradients]
+        self.gradientArrays = [g for w, b in zip(self.weightGradients, biasGradients) for g in (w, b)]
+        #in the order of parameter_arrays, the shapes of the weights and biases
+        self.predicted = np.empty(self.batchSize, dtype=np.intp)
+        self.labels = np.empty(self.batchSize, dtype=np.intp)
+        self.isCorrect = np.empty(self.batchSize, dtype=bool)
+        self.views = {} #batch length === the buffers cut down to that many rows
+    
+    def batch_views(self, batchLength):
+        #the buffers for a batch of batchLength samples, made once per length
+        if batchLength not in self.views:
+            rows = slice(0, batchLength)
+            self.views[batchLength] = (self.XBatch[rows], self.YBatch[rows],
+                                       [z[rows] for z in self.zs], [a[rows] for a in self.activations],
+                                       [d[rows] for d in self.deltas], [p[rows] for p in self.primes], [b[rows] for b in self.biasRows],
+                                       self.predicted[rows], self.labels[rows], self.isCorrect[rows])
+        return self.views[batchLength]
+    
+    def train_epoch(self, X, Y, order):
+        #X === (samples x features) and Y === (samples x outputs), in the engine's dtype to avoid a copy
+        #returns the number of samples the forward passes predicted correctly
+        X = np.asarray(X, dtype=self.dtype)
+        Y = np.asarray(Y, dtype=self.dtype)
+        numberOfCorrect = 0
+        with np.errstate(over='ignore'): #exp(-z) overflows to inf for very negative z in float32, the sigmoid is then 0 as it should be
+            for kthMiniBatch in range(0, len(order), self.batchSize):
+                learningRate = self.network.learning_rate_at(self.network.epochs_trained + kthMiniBatch/len(order))
+                numberOfCorrect = numberOfCorrect+self.step(X, Y, order[kthMiniBatch : kthMiniBatch+self.batchSize], learningRate)
+        return numberOfCorrect
+    
+    def step(self, X, Y, batchIndexs, learningRate = None):
+        #one mini batch: forward, backward and the optimizer's update, with SGD the same update as Network.backpropagation_batch
+        #returns how many of the batch the forward pass (before the update) got right
+        numberOfCorrect = self.compute_gradients(X, Y, batchIndexs)
+        self.apply_gradients(self.network.learning_rate if learningRate is None else learningRate, len(batchIndexs))
+        return numberOfCorrect
+    
+    def compute_gradients(self, X, Y, batchIndexs):
+        #forward and backward pass of one mini batch, leaves the gradients summed over the batch in the gradient buffers
+        #returns how many of the batch the forward pass got right
+        net = self.network
+        stats = net.stats #None unless the network is being profiled, then every layer's forward and backward time is added to it
+        XBatch, YBatch, zs, activations, deltas, primes, biasRows, predicted, labels, isCorrect = self.batch_views(len(batchIndexs))
+        np.take(X, batchIndexs, axis=0, out=XBatch, mode='clip') #mode='raise' would buffer the output
+        np.take(Y, batchIndexs, axis=0, out=YBatch, mode='clip')
+        
+        ##Feedforward Starts
+        activation = XBatch
+        for nthLayer in range(net.num_layers-1):
+            if stats is not None:
+                layerStartTime = time.perf_counter()
+            z = zs[nthLayer]
+            np.dot(activation, net.weights[nthLayer].T, out=z)
+            np.copyto(biasRows[nthLayer], net.biases[nthLayer].T)
+            np.add(z, biasRows[nthLayer], out=z)
+            activation = activations[nthLayer]
+            self.activate(z, activation)
+            if stats is not None:
+                stats.forward_seconds[nthLayer] += time.perf_counter()-layerStartTime
+        ##Feedforward Ends
+        
+        np.argmax(activation, axis=1, out=predicted)
+        np.argmax(YBatch, axis=1, out=labels)
+        np.equal(predicted, labels, out=isCorrect)
+        
+        ##Backward passing Starts
+        if stats is not None:
+            layerStartTime = time.perf_counter()
+        delta = deltas[-1]
+        np.subtract(activation, YBatch, out=delta) #cost derivative 2*(a-y)
+        np.multiply(delta, 2, out=delta)
+        self.activation_prime(activation, primes[-1])
+        np.multiply(delta, primes[-1], out=delta)
+        
+        nthLayer = net.num_layers-2
+        while nthLayer >= 0:
+            #layer nthLayer's time runs from its delta to the delta of the layer below
+            previousActivation = activations[nthLayer-1] if nthLayer > 0 else XBatch
+            np.sum(delta, axis=0, out=self.biasGradients[nthLayer])
+            np.dot(delta.T, previousActivation, out=self.weightGradients[nthLayer])
+            
+            if nthLayer > 0:
+                np.dot(delta, net.weights[nthLayer], out=deltas[nthLayer-1])
+                delta = deltas[nthLayer-1]
+                self.activation_prime(previousActivation, primes[nthLayer-1])
+                np.multiply(delta, primes[nthLayer-1], out=delta)
+            
+            if stats is not None:
+                layerEndTime = time.perf_counter()
+                stats.backward_seconds[nthLayer] += layerEndTime-layerStartTime
+                layerStartTime = layerEndTime
+            nthLayer = nthLayer-1
+        ##Backward passing Ends
+        if stats is not None:
+            stats.batches = stats.batches+1
+        
+        return int(np.count_nonzero(isCorrect))
+    
+    def apply_gradients(self, learningRate, batchLength):
+        #the network's optimizer updates the weights and biases in place, the gradient buffers are used as scratch space
+        net = self.network
+        net.optimizer.update(net.parameter_arrays(), self.gradientArrays, learningRate, batchLength)
+    
+    def activate(self, z, out):
+        #the network's activation function of z, written into out
+        if self.network.activation_function == 'softplus':
+            return np.logaddexp(0.0, z, out=out)
+        elif self.network.activation_function == 'ReLu':
+            return np.maximum(z, 0.0, out=out)
+        np.negative(z, out=out) #sigmoid, 1/(1+exp(-z)) in place
+        np.exp(out, out=out)
+        np.add(out, 1.0, out=out)
+        return np.reciprocal(out, out=out)
+    
+    def activation_prime(self, activation, out):
+        #derivative of the activation function from its output, see Network.activation_prime
+        if self.network.activation_function == 'softplus':
+            np.negative(activation, out=out)
+            np.exp(out, out=out)
+            return np.subtract(1.0, out, out=out)
+        elif self.network.activation_function == 'ReLu':
+            return np.greater(activation, 0.0, out=out)
+        np.subtract(1.0, activation, out=out)
+        return np.multiply(activation, out, out=out)
+    
+
+class NetworkStats(object):
+#opt-in profile of a network's training, switched on by net.stats = NetworkStats(net.sizes) and off by net.stats = None
+#forward_seconds[l] and backward_seconds[l] === the time of the l-th weight layer (l=0 is input -> 1st hidden) in the batched mini batch steps,
+#the backward time of a layer includes its gradients and passing its delta down one layer
+#samples and seconds count whole epochs of every training path, so samples_per_second includes the shuffling, the optimizer and, with workers > 1, the synchronisation
+#the layer times of data parallel workers stay in the worker processes, only the epochs are counted then
+
+
+    def __init__(self, sizes):
+        self.sizes = list(sizes)
+        self.forward_seconds = np.zeros(len(sizes)-1)
+        self.backward_seconds = np.zeros(len(sizes)-1)
+        self.batches = 0
+        self.samples = 0
+        self.seconds = 0.0
+        self.last_samples_per_second = float('nan')
+    
+    def add_epoch(self, samples, seconds):
+        self.samples = self.samples+samples
+        self.seconds = self.seconds+seconds
+        self.last_samples_per_second = samples/seconds if seconds > 0 else float('nan')
+    
+    @property
+    def samples_per_second(self):
+        return self.samples/self.seconds if self.seconds > 0 else float('nan')
+    
+    def as_dict(self):
+        layers = [dict(layer=f'{x}->{y}', forward_seconds=float(forward), backward_seconds=float(backward))
+                  for x, y, forward, backward in zip(self.sizes[:-1], self.sizes[1:], self.forward_seconds, self.backward_seconds)]
+        return dict(samples=self.samples, seconds=self.seconds, samples_per_second=self.samples_per_second, batches=self.batches, layers=layers)
+    
+    def __repr__(self):
+        lines = [f'NetworkStats: {self.samples} samples in {self.seconds:.3f} s, {self.samples_per_second:,.0f} samples/s, {self.batches} batches']
+        for layer in self.as_dict()['layers']:
+            lines.append(f"  layer {layer['layer']}: forward {layer['forward_seconds']:.3f} s, backward {layer['backward_seconds']:.3f} s")
+        return '\n'.join(lines)
+    
+
+class SGD(object):
+#plain stochastic gradient descent, parameter -= learning_rate * the gradient averaged over the batch
+#an optimizer's update gets the parameter arrays and the gradients summed over the batch in the same order,
+#it updates the parameters in place and may overwrite the gradients, its state buffers are allocated on the first update
+
+
+    def __init__(self):
+        self.state = {}
+    
+    def update(self, parameters, gradients, learningRate, batchLength):
+        for parameter, gradient in zip(parameters, gradients):
+            np.multiply(gradient, -1 * learningRate / batchLength, out=gradient)
+            np.add(parameter, gradient, out=parameter)
+    
+    def buffers(self, ithParameter, parameter, count):
+        #count zero-filled state buffers shaped like the ith parameter, the same buffers on every update
+        if ithParameter not in self.state:
+            self.state[ithParameter] = [np.zeros_like(parameter) for _ in range(count)]
+        return self.state[ithParameter]
+    
+    def fresh(self):
+        #the same optimizer without any state, e.g. for a worker process which updates other arrays
+        optimizer = copy.copy(self)
+        optimizer.state = {}
+        return optimizer
+
+
+class Momentum(SGD):
+#SGD with a velocity, velocity = momentum * velocity - learning_rate * gradient, parameter += velocity
+#nesterov=True applies the gradient at the look-ahead point, parameter += momentum * velocity - learning_rate * gradient
+
+
+    def __init__(self, momentum = 0.9, nesterov = False):
+        SGD.__init__(self)
+        self.momentum = momentum
+        self.nesterov = nesterov
+    
+    def update(self, parameters, gradients, learningRate, batchLength):
+        for ithParameter, (parameter, gradient) in enumerate(zip(parameters, gradients)):
+            velocity, = self.buffers(ithParameter, parameter, 1)
+            np.multiply(gradient, -1 * learningRate / batchLength, out=gradient)
+            np.multiply(velocity, self.momentum, out=velocity)
+            np.add(velocity, gradient, out=velocity)
+            if self.nesterov:
+                np.add(parameter, gradient, out=parameter)
+                np.multiply(velocity, self.momentum, out=gradient)
+                np.add(parameter, gradient, out=parameter)
+            else:
+                np.add(parameter, velocity, out=parameter)
+
+
+class Adam(SGD):
+#adaptive moment estimation, the step of every parameter is scaled by running averages of its gradient and squared gradient
+#the bias corrections of the averages are folded into the step size
+
+
+    def __init__(self, beta1 = 0.9, beta2 = 0.999, epsilon = 1e-8):
+        SGD.__init__(self)
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.epsilon = epsilon
+    
+    def update(self, parameters, gradients, learningRate, batchLength):
+        self.state['t'] = self.state.get('t', 0)+1
+        t = self.state['t']
+        stepSize = learningRate*math.sqrt(1-self.beta2**t)/(1-self.beta1**t)
+        for ithParameter, (parameter, gradient) in enumerate(zip(parameters, gradients)):
+            m, v, scratch = self.buffers(ithParameter, parameter, 3)
+            np.multiply(gradient, 1.0/batchLength, out=gradient)
+            np.multiply(m, self.beta1, out=m) #m = beta1*m + (1-beta1)*gradient
+            np.multiply(gradient, 1-self.beta1, out=scratch)
+            np.add(m, scratch, out=m)
+            np.multiply(v, self.beta2, out=v) #v = beta2*v + (1-beta2)*gradient**2
+            np.multiply(gradient, gradient, out=scratch)
+            np.multiply(scratch, 1-self.beta2, out=scratch)
+            np.add(v, scratch, out=v)
+            np.sqrt(v, out=scratch) #parameter -= stepSize * m / (sqrt(v) + epsilon)
+            np.add(scratch, self.epsilon, out=scratch)
+            np.divide(m, scratch, out=scratch)
+            np.multiply(scratch, -stepSize, out=scratch)
+            np.add(parameter, scratch, out=parameter)
+
+
+def make_optimizer(optimizer):
+    #an optimizer object from its name, optimizer objects are returned as they are
+    if not isinstance(optimizer, str):
+        return optimizer
+    if optimizer == 'sgd':
+        return SGD()
+    elif optimizer == 'momentum':
+        return Momentum()
+    elif optimizer == 'nesterov':
+        return Momentum(nesterov=True)
+    elif optimizer == 'adam':
+        return Adam()
+    raise ValueError(f"optimizer must be 'sgd', 'momentum', 'nesterov', 'adam' or an optimizer object, got {optimizer!r}")
+
+
+class StepDecay(object):
+#learning rate schedule: the rate is multiplied by gamma every step_epochs epochs
+
+
+    def __init__(self, step_epochs = 10, gamma = 0.5):
+        self.step_epochs = step_epochs
+        self.gamma = gamma
+    
+    def __call__(self, epoch):
+        return self.gamma**math.floor(epoch/self.step_epochs)
+
+
+class CosineDecay(object):
+#learning rate schedule: the rate falls from the full rate to min_factor * the rate along half a cosine over epochs epochs
+
+
+    def __init__(self, epochs, min_factor = 0.0):
+        self.epochs = epochs
+        self.min_factor = min_factor
+    
+    def __call__(self, epoch):
+        progress = min(epoch/self.epochs, 1.0)
+        return self.min_factor+(1-self.min_factor)*(1+math.cos(math.pi*progress))/2
+
+
+class Warmup(object):
+#learning rate schedule: the rate climbs linearly from 0 to the full rate over warmup_epochs epochs,
+#then follows the then schedule (counted from the end of the warm-up) or stays constant
+
+
+    def __init__(self, warmup_epochs = 1, then = None):
+        self.warmup_epochs = warmup_epochs
+        self.then = then
+    
+    def __call__(self, epoch):
+        if epoch < self.warmup_epochs:
+            return epoch/self.warmup_epochs
+        return 1.0 if self.then is None else self.then(epoch-self.warmup_epochs)
+
+
+def parameter_count(sizes):
+    #number of weights and biases of a network with these layer sizes
+    return sum((x+1)*y for x, y in zip(sizes[:-1], sizes[1:]))
+
+def parameter_views(sizes, flat):
+    #the weights (y x x) and biases (y x 1) of every layer as views into one flat vector, layer by layer, weights before biases
+    weights, biases, offset = [], [], 0
+    for x, y in zip(sizes[:-1], sizes[1:]):
+        weights.append(flat[offset:offset+y*x].reshape((y, x)))
+        offset = offset+y*x
+        biases.append(flat[offset:offset+y].reshape((y, 1)))
+        offset = offset+y
+    return weights, biases
+
+
+class DataParallelTrainer(object):
+#data parallel training of a Network on worker processes which stay alive from epoch to epoch
+#eg. with DataParallelTrainer(net, X, Y, workers=4) as trainer: trainer.train_epoch()
+#X, Y, the epoch's shuffled order, the parameters and one gradient vector per worker live in shared memory
+#synchronous mode (default): every worker computes the gradients of its shard (every workers-th row) of each mini batch,
+#then the gradients are all-reduced: worker k sums the k-th slice of all the gradient vectors and updates that slice of the parameters,
+#two barriers per mini batch keep the workers in step, so workers=1 gives the same weights as Network.train_epoch
+#hogwild=True: the workers take turns over whole mini batches and update the shared parameters in place without any lock,
+#a worker may read weights another worker is halfway through updating, which costs some accuracy per epoch but never waits
+#the network's optimizer and lr_schedule are used by every worker, each with its own optimizer state (its slice of the parameters in synchronous mode)
+#the network's own weights are only updated by close(), which the with block calls
+
+
+    def __init__(self, network, X, Y, workers = 2, hogwild = False, mp_context = None):
+        self.network = network
+        self.workers = workers
+        self.hogwild = hogwild
+        self.shms = []
+        self.processes = []
+        dtype = network.dtype
+        
+        parameters = np.concatenate([np.concatenate([w.ravel(), b.ravel()]) for w, b in zip(network.weights, network.biases)]).astype(dtype)
+        arrays = dict(X=np.asarray(X, dtype=dtype), Y=np.asarray(Y, dtype=dtype), order=np.arange(len(X)),
+                      parameters=parameters, gradients=np.zeros((workers, len(parameters)), dtype=dtype),
+                      correct=np.zeros(workers, dtype=np.int64), stop=np.zeros(1, dtype=np.int64), epoch=np.zeros(1))
+        specs = {}
+        try:
+            for key, a in arrays.items():
+                shm, specs[key] = share_array(a)
+                self.shms.append(shm)
+                setattr(self, key, np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf))
+            
+            context = mp_context if mp_context is not None else multiprocessing.get_context()
+            self.epochBarrier = context.Barrier(workers+1) #the workers and this process, at the start and the end of every epoch
+            self.stepBarrier = context.Barrier(workers) #the workers, twice per mini batch in synchronous mode
+            settings = dict(sizes=network.sizes, activation_function=network.activation_function, learning_rate=network.learning_rate,
+                            mini_batch_size=network.mini_batch_size, dtype=dtype.str, optimizer=network.optimizer.fresh(),
+                            lr_schedule=network.lr_schedule, workers=workers, hogwild=hogwild)
+            for rank in range(workers):
+                process = context.Process(target=data_parallel_worker, args=(rank, specs, settings, self.epochBarrier, self.stepBarrier), daemon=True)
+                process.start()
+                self.processes.append(process)
+        except BaseException:
+            self.close()
+            raise
+    
+    def train_epoch(self):
+        #one epoch over the rows in a new shuffled order, returns the number of correctly fitted samples
+        shuffledIndexs = np.asarray(range(0,len(self.order),1))
+        random.shuffle(shuffledIndexs)
+        self.order[:] = shuffledIndexs
+        self.epoch[0] = self.network.epochs_trained
+        try:
+            self.epochBarrier.wait() #start
+            self.epochBarrier.wait() #every worker is done
+        except threading.BrokenBarrierError:
+            raise RuntimeError("a data parallel worker process failed") from None
+        self.network.epochs_trained = self.network.epochs_trained+1
+        return int(self.correct.sum())
+    
+    def close(self):
+        #stops the workers, copies the trained parameters back into the network and frees the shared memory
+        if self.processes:
+            self.stop[0] = 1
+            try:
+                self.epochBarrier.wait(timeout=60)
+            except threading.BrokenBarrierError:
+                pass
+            for process in self.processes:
+                process.join(timeout=60)
+                if process.is_alive(): process.terminate()
+            self.processes = []
+        if hasattr(self, 'parameters'):
+            weights, biases = parameter_views(self.network.sizes, self.parameters)
+            for nthLayer in range(self.network.num_layers-1):
+                np.copyto(self.network.weights[nthLayer], weights[nthLayer])
+                np.copyto(self.network.biases[nthLayer], biases[nthLayer])
+            del self.X, self.Y, self.order, self.parameters, self.gradients, self.correct, self.stop, self.epoch
+        for shm in self.shms:
+            shm.close()
+            shm.unlink()
+        self.shms = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def data_parallel_worker(rank, specs, settings, epochBarrier, stepBarrier):
+    #the loop of one DataParallelTrainer worker process, rank === which shard of every mini batch (or which mini batches, hogwild) it trains on
+    shms, data = [], {}
+    for key, spec in specs.items():
+        shm, data[key] = attach_array(spec)
+        shms.append(shm)
+    X, Y, order, parameters, gradients, epoch = data['X'], data['Y'], data['order'], data['parameters'], data['gradients'], data['epoch']
+    workers, hogwild, miniBatchSize = settings['workers'], settings['hogwild'], settings['mini_batch_size']
+    
+    #the worker's network trains the shared parameters directly
+    net = Network(settings['sizes'], activation_function=settings['activation_function'], learning_rate=settings['learning_rate'],
+                  dtype=settings['dtype'], optimizer=settings['optimizer'], lr_schedule=settings['lr_schedule'],
+                  mini_batch_size=miniBatchSize if hogwild else -(-miniBatchSize // workers))
+    net.weights, net.biases = parameter_views(net.sizes, parameters)
+    engine = TrainingEngine(net, gradients=None if hogwild else gradients[rank])
+    sliceBounds = np.linspace(0, len(parameters), workers+1).astype(int)
+    mySlice = slice(sliceBounds[rank], sliceBounds[rank+1])
+    mySliceParameters = [parameters[mySlice]]
+    reduced = [np.empty(sliceBounds[rank+1]-sliceBounds[rank], dtype=parameters.dtype)]
+    
+    try:
+        with np.errstate(over='ignore'):
+            while True:
+                epochBarrier.wait()
+                if data['stop'][0]:
+                    break
+                numberOfCorrect = 0
+                if hogwild:
+                    for kthMiniBatch in range(rank*miniBatchSize, len(order), workers*miniBatchSize):
+                        learningRate = net.learning_rate_at(epoch[0] + kthMiniBatch/len(order))
+                        numberOfCorrect = numberOfCorrect+engine.step(X, Y, order[kthMiniBatch : kthMiniBatch+miniBatchSize], learningRate)
+                else:
+                    for kthMiniBatch in range(0, len(order), miniBatchSize):
+                        miniBatchIndexs = order[kthMiniBatch : kthMiniBatch+miniBatchSize]
+                        numberOfCorrect = numberOfCorrect+engine.compute_gradients(X, Y, miniBatchIndexs[rank::workers])
+                        stepBarrier.wait() #every shard's gradients are ready
+                        np.sum(gradients[:, mySlice], axis=0, out=reduced[0])
+                        learningRate = net.learning_rate_at(epoch[0] + kthMiniBatch/len(order))
+                        net.optimizer.update(mySliceParameters, reduced, learningRate, len(miniBatchIndexs))
+                        stepBarrier.wait() #every slice of the parameters is updated
+                data['correct'][rank] = numberOfCorrect
+                epochBarrier.wait()
+    except BaseException:
+        epochBarrier.abort()
+        stepBarrier.abort()
+        raise
+    finally:
+        del X, Y, order, parameters, gradients, epoch, data, engine, net, reduced, mySliceParameters
+        for shm in shms:
+            shm.close()
+    
+
+def mnist_one_hot(labels):
+    #(n x 10) targets with 0.99 at each label and 0.01 elsewhere, easier to calculate than 0 and 1
+    return np.where(np.asarray(labels)[:, None] == np.arange(10), 0.99, 0.01)
+
+def load_mnist(csv_path, pixels = 'float32'):
+    #x (n x 784) pixels mapped into [0.01, 1] and the (n,) uint8 labels of an mnist csv (label column then the 784 pixels)
+    #the first call converts the csv into csv_path without .csv + '.<pixels>.pixels.npy' and '.labels.npy', every later call
+    #memory-maps those (the cache is rebuilt when the csv is newer)
+    #pixels='float32' caches the mapped pixels, x is then the memory-mapped cache itself, no parsing and no copy
+    #pixels='uint8' caches the raw 0-255 pixels, a quarter of the disk, and maps them into [0.01, 1] on every load
+    if pixels not in ('float32', 'uint8'):
+        raise ValueError(f"pixels must be 'float32' or 'uint8', got {pixels!r}")
+    base = csv_path[:-4] if csv_path.endswith('.csv') else csv_path
+    pixels_path, labels_path = f'{base}.{pixels}.pixels.npy', f'{base}.labels.npy'
+    csv_time = os.path.getmtime(csv_path)
+    if not all(os.path.exists(path) and os.path.getmtime(path) >= csv_time for path in (pixels_path, labels_path)):
+        build_mnist_cache(csv_path, pixels_path, labels_path, pixels)
+    x = np.load(pixels_path, mmap_mode='r')
+    if pixels == 'uint8':
+        x = x*np.float32(0.99/255)+np.float32(.01)
+    return x, np.load(labels_path, mmap_mode='r')
+
+def build_mnist_cache(csv_path, pixels_path, labels_path, pixels, chunksize = 10_000):
+    #one chunked pass over the csv straight into the memory-mapped .npy files, the whole csv is never in memory
+    with open(csv_path, 'rb') as f:
+        rows = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b'')) - 1 #the header line
+        f.seek(-1, os.SEEK_END)
+        rows = rows + (f.read(1) != b'\n') #a last line without a newline
+    x = np.lib.format.open_memmap(pixels_path + '.tmp', mode='w+', dtype=pixels, shape=(rows, 784))
+    y = np.lib.format.open_memmap(labels_path + '.tmp', mode='w+', dtype=np.uint8, shape=(rows,))
+    start = 0
+    for df in pd.read_csv(csv_path, dtype=np.uint8, chunksize=chunksize):
+        chunk = df.to_numpy()
+        y[start:start+len(chunk)] = chunk[:, 0]
+        if pixels == 'float32':
+            #The images of the MNIST dataset are greyscale and the pixels range between 0 and 255 including both bounding values. 
+            #We will map these values into an interval from [0.01, 1] by multiplying each pixel by 0.99 / 255 and 
+            #adding 0.01 to the result. This way, we avoid 0 values as inputs, which are capable of preventing weight updates
+            x[start:start+len(chunk)] = chunk[:, 1:]*np.float32(0.99/255)+np.float32(.01)
+        else:
+            x[start:start+len(chunk)] = chunk[:, 1:]
+        start = start+len(chunk)
+    if start != rows:
+        raise ValueError(f"{csv_path} has {start} rows of data, {rows} lines were counted")
+    x.flush()
+    y.flush()
+    del x, y
+    os.replace(pixels_path + '.tmp', pixels_path)
+    os.replace(labels_path + '.tmp', labels_path)
+
+
+if __name__ == '__main__':
+    #We need the labels in our calculations in a one-hot representation. 
+    for label in range(10):
+        one_hot = ((np.arange(10))==label).astype(int)
+        print("label: ", label, " in one-hot representation: ", one_hot)
+    del one_hot,label
+
+    if os.path.exists('SkyNet.npy'):
+        #a checkpoint of an earlier run, no retraining
+        SkyNet = Network.load('SkyNet.npy')
+    else:
+        #Loading training data, the first run caches mnist_train.csv as .npy files next to it, see load_mnist
+        x_train, y_train = load_mnist('mnist_train.csv')
+        y_train = mnist_one_hot(y_train)
+
+        #Training the model
+        #SkyNet = Network([784,25,30, 10],activation_function='sigmoid', learning_rate = 5, epochs = 25, mini_batch_size=10)
+        SkyNet = Network([784,25,30, 10],activation_function='sigmoid', learning_rate = 5, required_training_accuracy = 0.95, mini_batch_size=10)
+        SkyNet.train(X=x_train,Y=y_train, max_epochs = 25)
+        #the batched training needs more epochs than the old sample by sample one at this learning_rate (~18 instead of 1-2), each far cheaper,
+        #max_epochs bounds the run in case the required accuracy is not reached
+        SkyNet.save('SkyNet.npy')
+        del x_train,y_train
+
+
+
+    #Loading testing data
+    x_test, y_test = load_mnist('mnist_test.csv')
+
+    #out of sample accuracy on the whole test set
+    print(f"Out of sample acc. on mnist_test.csv: {SkyNet.evaluate(x_test, y_test)*100:.2f}%")
+
+    #Select an out sample handwritten digit to predict
+    selected_OutSample_X = x_test[102]
+
+    #show imagine Example on a plot
+    import matplotlib.pyplot as plt
+    img = selected_OutSample_X.reshape((28,28))
+    plt.imshow(img, cmap="Greys")    
+    plt.show()    
+    del img
+
+    #use neural network to make prediction
+
+    print(SkyNet.predict(selected_OutSample_X,IsReturnPredictionPbty = True))
+    print("IS THE PREDICTED OUT_SAMPLE_X BASED ON above PROBABILITIES")
+
+
+
+
     
\ No newline at end of file
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+numpy arrays in multiprocessing shared memory, used by the process pools of
+"Decision Tree.py" (parallel_sweep, RandomForest) and NeuralNetwork.py (DataParallelTrainer)
+
+the parent copies an array in with share_array and passes the small spec to the workers,
+which attach_array to it by name instead of getting the data pickled
+"""
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def share_array(a):
+    #copies a into a new shared memory block, returns the block and the (name, shape, dtype) spec attach_array needs
+    a = np.ascontiguousarray(a)
+    shm = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+    np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)[...] = a
+    return shm, (shm.name, a.shape, a.dtype.str)
+
+def attach_array(spec):
+    #the array a share_array call put in shared memory, the SharedMemory handle must be kept alive as long as the array is used
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+@contextmanager
+def shared_arrays(**arrays):
+    #puts every array in shared memory for the duration of the with block, yields {name: spec}
+    shms, specs = [], {}
+    try:
+        for key, a in arrays.items():
+            shm, specs[key] = share_array(a)
+            shms.append(shm)
+        yield specs
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,48 @@
+"""Training throughput (rounds per second) and accuracy of GradientBoosting."""
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import load_decision_tree, load_student_grades, rel_mae
+
+dt = load_decision_tree()
+
+
+def run(name, x_train, y_train, x_valid, y_valid, x_test, y_test, **kwargs):
+    t0 = time.perf_counter()
+    model = dt.GradientBoosting(x_train, y_train, x_valid=x_valid, y_valid=y_valid, **kwargs)
+    elapsed = time.perf_counter() - t0
+    rounds = len(model.train_mse)
+    print(f'  {name:<28} {rounds:4} rounds (best {model.best_round:4})  {elapsed:7.2f} s  {rounds/elapsed:7.1f} rounds/s'
+          f'  test MAE {rel_mae(model.predict(x_test), y_test):.5f}')
+
+
+def main():
+    X, Y = load_student_grades()
+    X = np.asarray(X, dtype=float)
+    cut = int(0.2 * len(X))
+    rest = cut + np.random.default_rng(0).permutation(len(X) - cut)
+    valid, train = rest[:len(rest) // 5], rest[len(rest) // 5:]
+    #the script's 20% holdout is the test set, a random 20% of the other rows is the validation set for early stopping
+    #(the rows of the file are grouped by school, so the validation rows have to be shuffled)
+    x_test, y_test, x_valid, y_valid, x_train, y_train = X[:cut], Y[:cut], X[valid], Y[valid], X[train], Y[train]
+    tree = dt.DecisionTree(pd.DataFrame(X[cut:]), Y[cut:], min_leaf=5, max_depth=10)
+    print(f'dataForDecisionTree.txt, single tree test MAE {rel_mae(tree.predict(x_test), y_test):.5f}')
+    for subsample in [1.0, 0.5]:
+        run(f'max_depth=3, subsample={subsample}', x_train, y_train, x_valid, y_valid, x_test, y_test,
+            n_rounds=1000, learning_rate=0.05, max_depth=3, subsample=subsample, early_stopping_rounds=50)
+
+    rng = np.random.default_rng(0)
+    n = 100_000
+    x = rng.normal(size=(n + 40_000, 8))
+    y = 50 + 10 * np.sin(x[:, 0]) + x[:, 1] * x[:, 2] + x[:, 3] + rng.normal(size=len(x))
+    parts = (x[:n], y[:n], x[n:n + 20_000], y[n:n + 20_000], x[n + 20_000:], y[n + 20_000:])
+    print(f'synthetic {n:,} x 8, 100 rounds, max_depth=4, learning_rate=0.1')
+    for name, kwargs in [('exact', {}), ('exact, subsample=0.5', {'subsample': 0.5}),
+                         ('hist', {'hist': True}), ('hist, subsample=0.5', {'hist': True, 'subsample': 0.5})]:
+        run(name, *parts, n_rounds=100, learning_rate=0.1, max_depth=4, min_leaf=20, **kwargs)
+
+
+if __name__ == '__main__':
+    main()
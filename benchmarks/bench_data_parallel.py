@@ -0,0 +1,83 @@
+"""Data parallel Network training: epochs per second and accuracy vs worker count.
+
+Trains the same network (same initial weights, same shuffles) for a few
+epochs with Network.train_epoch in this process, with DataParallelTrainer
+in synchronous mode (gradients of every mini batch all-reduced through
+shared memory) and with hogwild=True (lock-free updates), for each worker
+count. Reports the epochs per second after the workers are started, the
+in-sample accuracy of the last epoch and the test set accuracy. Uses
+mnist_train.csv / mnist_test.csv when they are in the repository root,
+synthetic MNIST shaped digits otherwise. The speedups are only meaningful
+on a machine with at least as many free cores as workers.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+
+import numpy as np
+
+from common import load_mnist, load_network
+
+nn = load_network()
+
+
+def make_network(sizes, learning_rate, mini_batch_size):
+    np.random.seed(0)
+    random.seed(0)
+    return nn.Network(sizes, learning_rate=learning_rate, mini_batch_size=mini_batch_size)
+
+
+def run(name, args, sizes, x, y, x_test, y_test, workers=None, hogwild=False):
+    net = make_network(sizes, args.learning_rate, args.mini_batch_size)
+    epochs = args.epochs
+    t0 = time.perf_counter()
+    if workers is None:
+        epoch = lambda: net.train_epoch(x, y)
+        trainer = None
+    else:
+        trainer = nn.DataParallelTrainer(net, x, y, workers=workers, hogwild=hogwild,
+                                         mp_context=multiprocessing.get_context('fork'))
+        epoch = trainer.train_epoch
+    t_start = time.perf_counter() - t0
+    try:
+        t0 = time.perf_counter()
+        for _ in range(epochs):
+            correct = epoch()
+        t_train = time.perf_counter() - t0
+    finally:
+        if trainer is not None:
+            trainer.close()
+    print(f'  {name:<18} start {t_start:5.2f} s  {epochs/t_train:6.2f} epochs/s'
+          f'  last epoch acc. {correct/len(x)*100:6.2f}%  test acc. {net.evaluate(x_test, y_test)*100:6.2f}%')
+    return epochs / t_train
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--epochs', type=int, default=3)
+    parser.add_argument('--mini-batch-size', type=int, default=64)
+    parser.add_argument('--learning-rate', type=float, default=3)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--sizes', nargs='+', default=['784,25,30,10', '784,256,128,10'])
+    args = parser.parse_args()
+
+    x, y, synthetic = load_mnist(args.rows)
+    x_test, y_test, _ = load_mnist(split='test')
+    print(f'{len(x):,} {"synthetic " if synthetic else ""}MNIST rows, mini_batch_size={args.mini_batch_size},'
+          f' {args.epochs} epochs, {os.cpu_count()} cpus')
+    for sizes in args.sizes:
+        sizes = [int(size) for size in sizes.split(',')]
+        print(sizes)
+        single = run('single process', args, sizes, x, y, x_test, y_test)
+        for workers in args.workers:
+            rate = run(f'sync x{workers}', args, sizes, x, y, x_test, y_test, workers)
+            print(f'{"":<22}speedup {rate/single:.2f}x')
+            if workers > 1:
+                rate = run(f'hogwild x{workers}', args, sizes, x, y, x_test, y_test, workers, hogwild=True)
+                print(f'{"":<22}speedup {rate/single:.2f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""DecisionTree trained from a memory-mapped FeatureStore vs from an in-memory DataFrame.
+
+Converts dataForDecisionTree.txt (with the script's get_dummies encoding)
+and a larger synthetic csv with the same columns into FeatureStores,
+then reports the build time and the peak RSS of each way of training,
+in the exact and in the histogram (hist=True) mode, every run in a fresh
+process so the peaks don't mix.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import REPO_ROOT, load_decision_tree, load_student_grades, same_tree
+
+dt = load_decision_tree()
+
+FEATURES = ['school', 'sex', 'age', 'address', 'absences']
+DUMMIES = ['school', 'sex', 'address']
+EXTRA = 'noise_'
+#the synthetic csv gets extra numeric noise columns, so the feature matrix and not the per-node work dominates the memory
+
+
+def grades(df):
+    return df.G1 + df.G2 + df.G3
+
+
+def peak_rss_mib():
+    #VmHWM starts over at exec, ru_maxrss keeps the parent's peak on linux
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return kib / 1024 if sys.platform != 'darwin' else kib / 2**20
+
+
+def child(mode, csv_path, store_path, min_leaf, max_depth, hist):
+    #one measured run, prints its results as json
+    rss_before = peak_rss_mib()
+    t0 = time.perf_counter()
+    if mode == 'dataframe':
+        df = pd.read_csv(csv_path)
+        features = FEATURES + [col for col in df.columns if col.startswith(EXTRA)]
+        x = pd.get_dummies(df.loc[:, features], columns=DUMMIES, drop_first=True)
+        y = np.asarray(grades(df), dtype=float)
+        del df
+    else:
+        x = dt.FeatureStore(store_path)
+        y = x.y
+    t_load = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    tree = dt.DecisionTree(x, y, min_leaf=min_leaf, max_depth=max_depth, hist=hist)
+    t_build = time.perf_counter() - t0
+    print(json.dumps({'load_s': t_load, 'build_s': t_build, 'rss_before_mib': rss_before, 'peak_rss_mib': peak_rss_mib(),
+                      'nodes': len(tree.flatten())}))
+
+
+def measure(mode, csv_path, store_path, min_leaf, max_depth, hist):
+    out = subprocess.run([sys.executable, __file__, '--child', mode, csv_path, store_path, str(min_leaf), str(max_depth), str(int(hist))],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--extra-columns', type=int, default=20)
+    parser.add_argument('--child', nargs=6)
+    args = parser.parse_args()
+    if args.child:
+        mode, csv_path, store_path, min_leaf, max_depth, hist = args.child
+        return child(mode, csv_path, store_path, int(min_leaf), int(max_depth), hist == '1')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(REPO_ROOT, 'dataForDecisionTree.txt')
+        store = dt.FeatureStore.from_csv(csv_path, os.path.join(tmp, 'grades.npy'), FEATURES, DUMMIES, target=grades)
+        X, Y = load_student_grades()
+        assert store.columns == list(X.columns)
+        assert np.array_equal(store.values, np.asarray(X, dtype=np.float32)) and np.array_equal(store.y, Y)
+        assert same_tree(dt.DecisionTree(X, Y, min_leaf=2, max_depth=10), dt.DecisionTree(store, store.y, min_leaf=2, max_depth=10))
+        print(f'{store}: same encoding and same tree as the DataFrame')
+
+        big_csv = os.path.join(tmp, 'grades_big.csv')
+        df = pd.read_csv(csv_path)
+        rng = np.random.default_rng(0)
+        big = df.iloc[rng.integers(0, len(df), args.rows)].reset_index(drop=True)
+        big['absences'] += rng.integers(0, 5, args.rows)
+        extra = [f'{EXTRA}{i}' for i in range(args.extra_columns)]
+        big = pd.concat([big.loc[:, FEATURES + ['G1', 'G2', 'G3']],
+                         pd.DataFrame(rng.integers(0, 100, (args.rows, len(extra))), columns=extra)], axis=1)
+        big.to_csv(big_csv, index=False)
+        del big, df
+        t0 = time.perf_counter()
+        store = dt.FeatureStore.from_csv(big_csv, os.path.join(tmp, 'grades_big.npy'), FEATURES + extra, DUMMIES, target=grades)
+        print(f'synthetic {args.rows:,} rows x {len(store.columns)} columns: csv {os.path.getsize(big_csv)/2**20:.1f} MiB -> store'
+              f' {os.path.getsize(store.path)/2**20:.1f} MiB in {time.perf_counter() - t0:.2f} s')
+        del store
+        for hist in [False, True]:
+            for mode in ['dataframe', 'store']:
+                r = measure(mode, big_csv, os.path.join(tmp, 'grades_big.npy'), 100, 8, hist)
+                label = f'{"hist" if hist else "exact"} {mode}'
+                print(f'  {label:<16} load {r["load_s"]:6.2f} s  build {r["build_s"]:6.2f} s  peak RSS {r["peak_rss_mib"]:7.1f} MiB'
+                      f' (after imports {r["rss_before_mib"]:6.1f} MiB)'
+                      f'  ({r["nodes"]} nodes)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Row by row predict_row vs the vectorized FlatTree predict, and the memory of both tree forms."""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from common import best_of, load_decision_tree, load_student_grades
+
+dt = load_decision_tree()
+
+
+def node_objects_nbytes(tree):
+    #the node objects themselves plus their own idxs arrays, x and y are shared by all the nodes and not counted
+    total, stack = 0, [tree]
+    while stack:
+        node = stack.pop()
+        total += sys.getsizeof(node) + sys.getsizeof(node.__dict__) + node.idxs.nbytes
+        if not node.is_leaf: stack += [node.lhs, node.rhs]
+    return total
+
+
+def compare(name, tree, x_test, repeat=3):
+    rows = np.asarray(x_test, dtype=float)
+    t_rows, by_row = best_of(lambda: np.array([tree.predict_row(xi) for xi in rows]), repeat)
+    flat = tree.flatten()
+    t_flat, by_flat = best_of(lambda: flat.predict(rows), repeat)
+    assert np.array_equal(by_row, by_flat)
+    print(f'  {name:<36} {len(flat):6} nodes  predict_row {t_rows*1000:8.1f} ms  flat {t_flat*1000:7.2f} ms'
+          f'  speedup {t_rows/t_flat:6.1f}x  memory {node_objects_nbytes(tree)/1024:8.1f} KiB -> {flat.nbytes/1024:6.1f} KiB')
+
+
+def main():
+    X, Y = load_student_grades()
+    cut = int(0.2 * len(X))
+    print(f'predicting {cut} rows of dataForDecisionTree.txt')
+    for min_leaf, max_depth in [(0, 100), (5, 10)]:
+        tree = dt.DecisionTree(X[cut:], Y[cut:], min_leaf=min_leaf, max_depth=max_depth)
+        compare(f'min_leaf={min_leaf} max_depth={max_depth}', tree, X[:cut])
+
+    rng = np.random.default_rng(0)
+    n, n_test = 200_000, 100_000
+    x = rng.normal(size=(n + n_test, 4))
+    y = 10 * np.sin(x[:, 0]) + x[:, 1] * x[:, 2] + rng.normal(size=n + n_test)
+    print(f'predicting {n_test:,} synthetic rows')
+    for max_depth in [8, 16]:
+        tree = dt.DecisionTree(pd.DataFrame(x[:n]), y[:n], min_leaf=5, max_depth=max_depth, hist=True)
+        compare(f'{n:,} training rows, max_depth={max_depth}', tree, x[n:], repeat=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Accuracy vs speed of the histogram mode (hist=True) against the exact DecisionTree.
+
+The out of sample error is the same relative MAE as "Decision Tree.py":
+mean(|y_hat - y|) / mean(y).
+"""
+import numpy as np
+import pandas as pd
+
+from common import best_of, load_decision_tree, load_student_grades, rel_mae
+
+dt = load_decision_tree()
+
+
+def holdout_mae(tree, x_test, y_test):
+    return rel_mae(tree.predict(np.asarray(x_test, dtype=float)), y_test)
+
+
+def compare(name, x_train, y_train, x_test, y_test, min_leaf, max_depth, bins_list, repeat=3):
+    print(f'{name}, min_leaf={min_leaf}, max_depth={max_depth}')
+    t_exact, tree = best_of(lambda: dt.DecisionTree(x_train, y_train, min_leaf=min_leaf, max_depth=max_depth), repeat)
+    print(f'  {"exact":<10} build {t_exact*1000:9.1f} ms  out sample MAE {holdout_mae(tree, x_test, y_test):.5f}')
+    for max_bins in bins_list:
+        t_hist, tree = best_of(lambda: dt.DecisionTree(x_train, y_train, min_leaf=min_leaf, max_depth=max_depth,
+                                                       hist=True, max_bins=max_bins), repeat)
+        print(f'  {f"{max_bins} bins":<10} build {t_hist*1000:9.1f} ms  out sample MAE {holdout_mae(tree, x_test, y_test):.5f}'
+              f'  speedup {t_exact/t_hist:5.1f}x')
+
+
+def main():
+    X, Y = load_student_grades()
+    cut = int(0.2 * len(X))
+    for min_leaf, max_depth in [(2, 5), (10, 20)]:
+        compare('dataForDecisionTree.txt', X[cut:], Y[cut:], X[:cut], Y[:cut], min_leaf, max_depth, [4, 16, 256])
+
+    rng = np.random.default_rng(0)
+    n, n_test = 1_000_000, 10_000
+    x = np.column_stack([rng.normal(size=n + n_test) for _ in range(4)] + [rng.integers(0, 2, n + n_test)])
+    y = 10 * np.sin(x[:, 0]) + 5 * x[:, 1] * x[:, 4] + x[:, 2] ** 2 + rng.normal(size=n + n_test)
+    compare(f'synthetic {n:,} x 5', pd.DataFrame(x[:n]), y[:n], x[n:], y[n:], 50, 10, [16, 64, 256], repeat=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Load generator for InferenceServer.py: one predict per request vs micro batching.
+
+Saves a [784,25,30,10] network checkpoint, then for every server setting
+starts ``python InferenceServer.py`` on a Unix socket (--tcp for 127.0.0.1)
+and drives it with --connections concurrent keep-alive clients, each posting
+one test row at a time for --seconds. Prints the client side throughput and
+p50/p99 latency next to the server's /metrics (its own latency, excluding
+the HTTP round trip, and the mean rows per batch). --max-batch-size 1 is
+the one predict per request baseline.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from common import REPO_ROOT, load_mnist, load_network
+
+nn = load_network()
+
+SETTINGS = [(1, 0.0), (16, 1.0), (64, 2.0), (256, 5.0)] #(max batch size, max wait ms)
+
+
+async def request(reader, writer, method, target, body=b''):
+    writer.write(b'%s %s HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n'
+                 % (method, target, len(body)) + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b'\r\n':
+            break
+        key, value = line.split(b':', 1)
+        if key.strip().lower() == b'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def connect(address):
+    if isinstance(address, tuple):
+        return await asyncio.open_connection(*address)
+    return await asyncio.open_unix_connection(address)
+
+
+async def client(address, bodies, stop_at, latencies):
+    reader, writer = await connect(address)
+    index = random.randrange(len(bodies))
+    while time.perf_counter() < stop_at:
+        t0 = time.perf_counter()
+        status, _ = await request(reader, writer, b'POST', b'/predict', bodies[index])
+        assert status == 200
+        latencies.append(time.perf_counter() - t0)
+        index = (index + 1) % len(bodies)
+    writer.close()
+
+
+async def drive(address, bodies, connections, seconds):
+    reader, writer = await connect(address)
+    await request(reader, writer, b'POST', b'/metrics/reset')
+    latencies = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*[client(address, bodies, t0 + seconds, latencies) for _ in range(connections)])
+    elapsed = time.perf_counter() - t0
+    _, metrics = await request(reader, writer, b'GET', b'/metrics')
+    writer.close()
+    return np.asarray(latencies) * 1000, elapsed, metrics
+
+
+def start_server(checkpoint, address, max_batch_size, max_wait_ms):
+    command = [sys.executable, os.path.join(REPO_ROOT, 'InferenceServer.py'), checkpoint,
+               '--max-batch-size', str(max_batch_size), '--max-wait-ms', str(max_wait_ms)]
+    command += ['--port', str(address[1])] if isinstance(address, tuple) else ['--unix', address]
+    server = subprocess.Popen(command, cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True)
+    server.stdout.readline() #"serving ..." once the checkpoint is loaded, the socket follows right after
+    for _ in range(200):
+        probe = socket.socket(socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX)
+        try:
+            probe.connect(address)
+            return server
+        except OSError:
+            time.sleep(0.05)
+        finally:
+            probe.close()
+    server.kill()
+    raise RuntimeError('the server did not come up')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connections', type=int, default=64)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--tcp', action='store_true', help='serve on 127.0.0.1 instead of a Unix socket')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    x_test, _, synthetic = load_mnist(2000, split='test')
+    bodies = [json.dumps({'pixels': row.tolist()}).encode() for row in x_test]
+    np.random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, 'net.npy')
+        nn.Network([784, 25, 30, 10]).save(checkpoint)
+        address = ('127.0.0.1', args.port) if args.tcp else os.path.join(tmp, 'server.sock')
+        print(f'{args.connections} connections x {args.seconds:g} s over {"TCP" if args.tcp else "a Unix socket"},'
+              f' one {"synthetic " if synthetic else ""}MNIST row per request, [784,25,30,10] network')
+        print(f'  {"batch":>5} {"wait":>6} {"req/s":>9} {"p50 ms":>8} {"p99 ms":>8}'
+              f' | server {"p50 ms":>7} {"p99 ms":>7} {"rows/batch":>10}')
+        baseline = None
+        for max_batch_size, max_wait_ms in SETTINGS:
+            server = start_server(checkpoint, address, max_batch_size, max_wait_ms)
+            try:
+                latencies, elapsed, metrics = asyncio.run(drive(address, bodies, args.connections, args.seconds))
+            finally:
+                server.terminate()
+                server.wait()
+            throughput = len(latencies) / elapsed
+            baseline = baseline or throughput
+            print(f'  {max_batch_size:5d} {max_wait_ms:6.1f} {throughput:9,.0f} {np.percentile(latencies, 50):8.2f}'
+                  f' {np.percentile(latencies, 99):8.2f} | server {metrics["p50_ms"]:7.2f} {metrics["p99_ms"]:7.2f}'
+                  f' {metrics["mean_batch_rows"]:10.1f}  {throughput/baseline:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
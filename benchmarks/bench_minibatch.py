@@ -0,0 +1,61 @@
+"""Network.train_epoch sample by sample vs whole mini batches at a time.
+
+Times one epoch of the [784,25,30,10] network from the NeuralNetwork.py
+script on MNIST (synthetic MNIST shaped digits when mnist_train.csv is not
+in the repository root) and reports samples per second for a few batch sizes,
+plus the in-sample accuracy after a few epochs of each path.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from common import load_mnist, load_network
+
+nn = load_network()
+
+
+def make_network(mini_batch_size, seed=0):
+    np.random.seed(seed)
+    random.seed(seed)
+    return nn.Network([784, 25, 30, 10], learning_rate=5, mini_batch_size=mini_batch_size)
+
+
+def epoch_rate(x, y, mini_batch_size, batched):
+    net = make_network(mini_batch_size)
+    t0 = time.perf_counter()
+    net.train_epoch(x, y, batched=batched)
+    return len(x) / (time.perf_counter() - t0)
+
+
+def accuracy_after(x, y, mini_batch_size, batched, epochs):
+    net = make_network(mini_batch_size)
+    for _ in range(epochs):
+        correct = net.train_epoch(x, y, batched=batched)
+    return correct / len(x)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--epochs', type=int, default=3)
+    args = parser.parse_args()
+
+    x, y, synthetic = load_mnist(args.rows)
+    print(f'{len(x):,} {"synthetic " if synthetic else ""}MNIST rows, [784,25,30,10] network, learning_rate=5')
+    per_sample = epoch_rate(x, y, 10, batched=False)
+    print(f'  sample by sample (mini_batch_size=10) {per_sample:10,.0f} samples/s')
+    for mini_batch_size in [10, 32, 128]:
+        rate = epoch_rate(x, y, mini_batch_size, batched=True)
+        print(f'  batched mini_batch_size={mini_batch_size:<4}          {rate:10,.0f} samples/s  {rate/per_sample:5.1f}x')
+
+    print(f'in-sample accuracy of the last of {args.epochs} epochs')
+    print(f'  sample by sample (mini_batch_size=10) {accuracy_after(x, y, 10, False, args.epochs)*100:6.2f}%')
+    for mini_batch_size in [10, 32]:
+        print(f'  batched mini_batch_size={mini_batch_size:<4}          '
+              f'{accuracy_after(x, y, mini_batch_size, True, args.epochs)*100:6.2f}%')
+
+
+if __name__ == '__main__':
+    main()
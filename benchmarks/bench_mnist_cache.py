@@ -0,0 +1,114 @@
+"""Startup cost of NeuralNetwork.py: csv parsing vs the .npy cache, retraining vs a checkpoint.
+
+Writes MNIST csvs (a copy of mnist_train.csv / mnist_test.csv when they are
+in the repository root, synthetic MNIST shaped digits in the same format
+otherwise) to a temporary directory and times, each in a fresh process:
+
+- the original loading, pd.read_csv + scaling + one-hot labels
+- load_mnist building its cache (the first run)
+- load_mnist memory-mapping the cache (every later run), float32 and uint8
+- Network.load of a checkpoint + predict_batch of the test set, vs
+  training the network until it predicts as well
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import REPO_ROOT, load_mnist, load_network
+
+nn = load_network()
+
+CHILD = r'''
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {repo!r})
+import numpy as np, pandas as pd
+import NeuralNetwork as nn
+t_import = time.perf_counter() - t0
+mode, path = sys.argv[1], sys.argv[2]
+t0 = time.perf_counter()
+if mode == 'read_csv':
+    df = pd.read_csv(path)
+    x = df.loc[:, df.columns != 'label'].to_numpy(dtype=float)*0.99 / 255+.01
+    y = nn.mnist_one_hot(df['label'].to_numpy())
+    checksum = float(x[:, 400].sum())
+elif mode in ('float32', 'uint8'):
+    x, labels = nn.load_mnist(path, pixels=mode)
+    y = nn.mnist_one_hot(labels)
+    checksum = float(x[:, 400].sum())
+else:
+    net = nn.Network.load(mode)
+    x, labels = nn.load_mnist(path)
+    checksum = float(np.mean(net.predict_batch(x) == labels))
+print(json.dumps(dict(seconds=time.perf_counter() - t0, imports=t_import, checksum=checksum)))
+'''
+
+
+def child(mode, path):
+    out = subprocess.run([sys.executable, '-c', CHILD.format(repo=REPO_ROOT), mode, path],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def write_csv(path, split, rows):
+    source = os.path.join(REPO_ROOT, f'mnist_{split}.csv')
+    if os.path.exists(source):
+        shutil.copy(source, path)
+        return False
+    x, y, _ = load_mnist(rows, split=split)
+    pixels = np.round((x - .01) * 255 / 0.99).astype(np.uint8)
+    df = pd.DataFrame(pixels, columns=[f'{i}x{j}' for i in range(1, 29) for j in range(1, 29)])
+    df.insert(0, 'label', np.argmax(y, axis=1))
+    df.to_csv(path, index=False)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=60_000, help='rows of the synthetic training csv')
+    parser.add_argument('--epochs', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        train_csv, test_csv = os.path.join(tmp, 'mnist_train.csv'), os.path.join(tmp, 'mnist_test.csv')
+        synthetic = write_csv(train_csv, 'train', args.rows)
+        write_csv(test_csv, 'test', 10_000)
+        print(f'{"synthetic " if synthetic else ""}mnist_train.csv {os.path.getsize(train_csv)/2**20:.1f} MiB,'
+              f' each run in a fresh process (import time not included)')
+        baseline = child('read_csv', train_csv)
+        print(f'  pd.read_csv + scaling + one-hot     {baseline["seconds"]:7.3f} s')
+        for pixels in ['float32', 'uint8']:
+            first, cached = child(pixels, train_csv), child(pixels, train_csv)
+            assert abs(cached['checksum'] - baseline['checksum']) < 1e-3 * abs(baseline['checksum'])
+            size = os.path.getsize(os.path.join(tmp, f'mnist_train.{pixels}.pixels.npy'))
+            print(f'  load_mnist {pixels:<7} building cache   {first["seconds"]:7.3f} s  ({size/2**20:.1f} MiB)')
+            print(f'  load_mnist {pixels:<7} from the cache   {cached["seconds"]:7.3f} s'
+                  f'  {baseline["seconds"]/cached["seconds"]:8.0f}x')
+
+        x, labels = nn.load_mnist(train_csv)
+        np.random.seed(0)
+        net = nn.Network([784, 25, 30, 10], learning_rate=5, mini_batch_size=32)
+        t0 = time.perf_counter()
+        for _ in range(args.epochs):
+            net.train_epoch(x, nn.mnist_one_hot(labels))
+        t_train = time.perf_counter() - t0
+        checkpoint = os.path.join(tmp, 'SkyNet.npy')
+        net.save(checkpoint)
+        x_test, test_labels = nn.load_mnist(test_csv)
+        restored = child(checkpoint, test_csv)
+        assert abs(restored['checksum'] - net.evaluate(x_test, test_labels)) < 1e-12
+        print(f'  training {args.epochs} epochs                    {t_train:7.3f} s')
+        print(f'  Network.load + predict_batch         {restored["seconds"]:7.3f} s'
+              f'  (test acc. {restored["checksum"]*100:.2f}%, same as the trained network)')
+
+
+if __name__ == '__main__':
+    main()
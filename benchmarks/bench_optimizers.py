@@ -0,0 +1,62 @@
+"""Wall clock time to 95% in-sample accuracy for each optimizer and learning rate schedule.
+
+Trains the [784,25,30,10] network of NeuralNetwork.py with Network.train
+(required_training_accuracy=0.95, a budget of --max-epochs epochs and
+--max-seconds seconds) from the same initial weights for every setting,
+and reports the epochs and seconds it took (or that the budget ran out)
+and the test set accuracy at the end. Uses mnist_train.csv / mnist_test.csv
+when they are in the repository root, synthetic MNIST shaped digits
+otherwise.
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+import numpy as np
+
+from common import load_mnist, load_network
+
+nn = load_network()
+
+SETTINGS = [
+    ('sgd, the script\'s rate', dict(optimizer='sgd', learning_rate=5)),
+    ('sgd', dict(optimizer='sgd', learning_rate=3)),
+    ('sgd + cosine', dict(optimizer='sgd', learning_rate=3, lr_schedule=nn.CosineDecay(10, min_factor=0.1))),
+    ('sgd + step decay', dict(optimizer='sgd', learning_rate=3, lr_schedule=nn.StepDecay(3, gamma=0.5))),
+    ('momentum', dict(optimizer='momentum', learning_rate=0.1)),
+    ('nesterov', dict(optimizer='nesterov', learning_rate=0.1)),
+    ('adam', dict(optimizer='adam', learning_rate=0.01)),
+    ('adam + warmup, cosine', dict(optimizer='adam', learning_rate=0.02,
+                                   lr_schedule=nn.Warmup(1, then=nn.CosineDecay(10, min_factor=0.1)))),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--mini-batch-size', type=int, default=32)
+    parser.add_argument('--max-epochs', type=int, default=30)
+    parser.add_argument('--max-seconds', type=float, default=120)
+    args = parser.parse_args()
+
+    x, y, synthetic = load_mnist(args.rows)
+    x_test, y_test, _ = load_mnist(split='test')
+    print(f'{len(x):,} {"synthetic " if synthetic else ""}MNIST rows, [784,25,30,10] network,'
+          f' mini_batch_size={args.mini_batch_size}, time to 95% in-sample accuracy')
+    for name, settings in SETTINGS:
+        np.random.seed(0)
+        random.seed(0)
+        net = nn.Network([784, 25, 30, 10], required_training_accuracy=0.95, mini_batch_size=args.mini_batch_size, **settings)
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            accuracy = net.train(x, y, max_epochs=args.max_epochs, max_seconds=args.max_seconds)
+        seconds = time.perf_counter() - t0
+        result = 'reached' if accuracy >= 0.95 else 'budget out'
+        print(f'  {name:<24} lr {settings["learning_rate"]:<5} {result:<10} {net.epochs_trained:3d} epochs {seconds:7.2f} s'
+              f'  in-sample {accuracy*100:6.2f}%  test {net.evaluate(x_test, y_test)*100:6.2f}%')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Scaling of parallel_sweep with the number of worker processes.
+
+Runs the script's 51 x 99 min_leaf/max_depth grid with 5-fold cross
+validation on dataForDecisionTree.txt and on a larger synthetic set,
+for 1, 2, 4, ... workers up to the number of cores.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from common import load_decision_tree, load_student_grades, mp_context
+
+dt = load_decision_tree()
+
+
+def worker_counts(max_workers):
+    counts, k = [], 1
+    while k < max_workers:
+        counts.append(k)
+        k *= 2
+    return counts + [max_workers]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    parser.add_argument('--folds', type=int, default=5)
+    args = parser.parse_args()
+
+    X, Y = load_student_grades()
+    cut = int(0.2 * len(X))
+    holdout = np.r_[np.zeros(cut, dtype=int), -np.ones(len(X) - cut, dtype=int)]
+    fixed = dt.parallel_sweep(X, Y, range(51), range(2, 101), folds=holdout, max_workers=1, mp_context=mp_context())[0]
+    expected = dt.sweep_min_leaf_max_depth(X[cut:], Y[cut:], X[:cut], Y[:cut], range(51), range(2, 101))
+    assert np.array_equal(fixed, expected)
+    print('fixed 20% holdout surface matches sweep_min_leaf_max_depth')
+
+    rng = np.random.default_rng(0)
+    n = 20_000
+    x = rng.normal(size=(n, 6))
+    y = 50 + 10 * np.sin(x[:, 0]) + x[:, 1] * x[:, 2] + rng.normal(size=n)
+    cases = [('dataForDecisionTree.txt', X, Y, range(51), {}),
+             (f'synthetic {n:,} x 6, hist', x, y, range(5, 51, 5), {'hist': True})]
+    for name, xs, ys, min_leafs, tree_kwargs in cases:
+        print(f'{name}: {len(min_leafs)} min_leaf x 99 max_depth x {args.folds} folds')
+        base = None
+        for workers in worker_counts(args.max_workers):
+            t0 = time.perf_counter()
+            mae = dt.parallel_sweep(xs, ys, min_leafs, range(2, 101), folds=args.folds, max_workers=workers,
+                                    mp_context=mp_context(), **tree_kwargs)
+            elapsed = time.perf_counter() - t0
+            base = base or elapsed
+            print(f'  {workers:3} workers {elapsed:8.2f} s  speedup {base/elapsed:5.2f}x'
+                  f'  efficiency {base/elapsed/workers*100:5.1f}%  best CV MAE {mae.mean(axis=0).min():.5f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Network inference one sample at a time vs predict_batch / evaluate.
+
+Scores the test set (mnist_test.csv, or synthetic MNIST shaped digits when
+it is not in the repository root) with a [784,25,30,10] network trained
+for a couple of epochs: a loop of Network.predict vs predict_batch at a few
+chunk sizes, and evaluate. Also times the sample by sample training epoch
+with the accuracy check the old way, a second feedforward per sample, vs
+train_epoch(batched=False), which reads the accuracy off backpropagation's
+forward pass.
+"""
+import argparse
+import random
+
+import numpy as np
+
+from common import best_of, load_mnist, load_network
+
+nn = load_network()
+
+
+def old_sample_epoch(net, x, y):
+    order = np.random.default_rng(0).permutation(len(x))
+    correct = 0
+    for index in order:
+        net.backpropagation(X=x[index], Y=y[index])
+        correct += bool(net.InSampleFittingEvaluator(X=x[index], Y=y[index]))
+    return correct
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--train-rows', type=int, default=20_000)
+    args = parser.parse_args()
+
+    x_train, y_train, synthetic = load_mnist(args.train_rows)
+    x_test, y_test, _ = load_mnist(split='test')
+    labels = np.argmax(y_test, axis=1)
+    np.random.seed(0)
+    random.seed(0)
+    net = nn.Network([784, 25, 30, 10], learning_rate=5, mini_batch_size=32)
+    for _ in range(2):
+        net.train_epoch(x_train, y_train)
+    print(f'{len(x_test):,} {"synthetic " if synthetic else ""}MNIST test rows, [784,25,30,10] network')
+
+    t_loop, loop = best_of(lambda: np.array([net.predict(row, IsReturnPredictionPbty=False) for row in x_test]), 1)
+    print(f'  predict per row            {t_loop*1000:8.1f} ms  {len(x_test)/t_loop:12,.0f} rows/s')
+    for chunk_size in [256, 1024, len(x_test)]:
+        t_batch, batch = best_of(lambda: net.predict_batch(x_test, chunk_size=chunk_size))
+        assert np.array_equal(batch, loop)
+        print(f'  predict_batch chunk={chunk_size:<6} {t_batch*1000:8.1f} ms  {len(x_test)/t_batch:12,.0f} rows/s'
+              f'  {t_loop/t_batch:6.1f}x')
+    t_eval, accuracy = best_of(lambda: net.evaluate(x_test, labels))
+    print(f'  evaluate                   {t_eval*1000:8.1f} ms  accuracy {accuracy*100:.2f}%')
+
+    relu = nn.Network([784, 25, 30, 10], activation_function='ReLu')
+    relu.biases[-1][:] = -1e6 #every output unit is off, the activations of every row sum to 0
+    probabilities = relu.predict_proba(x_test[:100])
+    assert np.all(np.isfinite(probabilities)) and np.allclose(probabilities, 0.1)
+    print('  predict_proba of all-zero output rows: uniform, no nan')
+
+    rows = x_train[:5000], y_train[:5000]
+    t_old, _ = best_of(lambda: old_sample_epoch(net, *rows))
+    t_new, _ = best_of(lambda: net.train_epoch(*rows, batched=False))
+    print(f'sample by sample epoch of {len(rows[0]):,} rows: second feedforward {t_old:.2f} s,'
+          f' backpropagation\'s activations {t_new:.2f} s ({t_old/t_new:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
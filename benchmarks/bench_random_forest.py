@@ -0,0 +1,56 @@
+"""RandomForest vs a single DecisionTree, parallel tree construction and batched prediction.
+
+Reports out of sample MAE on the script's 20% holdout next to the
+forest's own out of bag MAE, the build time for 1, 2, 4, ... workers and
+the batched predict against predicting tree by tree.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from common import best_of, load_decision_tree, load_student_grades, mp_context, rel_mae
+
+dt = load_decision_tree()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    parser.add_argument('--trees', type=int, default=200)
+    args = parser.parse_args()
+
+    X, Y = load_student_grades()
+    cut = int(0.2 * len(X))
+    x_train, y_train, x_test, y_test = X[cut:], Y[cut:], np.asarray(X[:cut], dtype=float), Y[:cut]
+    tree = dt.DecisionTree(x_train, y_train, min_leaf=5, max_depth=10)
+    print(f'dataForDecisionTree.txt, single tree holdout MAE {rel_mae(tree.predict(x_test), y_test):.5f}')
+    forest = dt.RandomForest(x_train, y_train, n_trees=args.trees, min_leaf=5, max_depth=10, max_features=2, max_workers=1)
+    print(f'  {args.trees} trees: holdout MAE {rel_mae(forest.predict(x_test), y_test):.5f}  OOB MAE {forest.oob_mae:.5f}')
+
+    rng = np.random.default_rng(0)
+    n, n_test = 100_000, 20_000
+    x = rng.normal(size=(n + n_test, 8))
+    y = 50 + 10 * np.sin(x[:, 0]) + x[:, 1] * x[:, 2] + x[:, 3] + rng.normal(size=n + n_test)
+    n_trees = args.trees // 4
+    print(f'synthetic {n:,} x 8, {n_trees} hist trees, max_depth=12')
+    workers = 1
+    while True:
+        t0 = time.perf_counter()
+        forest = dt.RandomForest(x[:n], y[:n], n_trees=n_trees, min_leaf=20, max_depth=12, max_features=0.5, hist=True,
+                                 max_workers=workers, mp_context=mp_context())
+        elapsed = time.perf_counter() - t0
+        print(f'  {workers:3} workers build {elapsed:7.2f} s  holdout MAE {rel_mae(forest.predict(x[n:]), y[n:]):.5f}'
+              f'  OOB MAE {forest.oob_mae:.5f}')
+        if workers >= args.max_workers: break
+        workers = min(2 * workers, args.max_workers)
+
+    t_batch, batched = best_of(lambda: forest.predict(x[n:]))
+    t_each, each = best_of(lambda: np.mean([t.predict(x[n:]) for t in forest.trees], axis=0))
+    assert np.allclose(batched, each)
+    print(f'  predict {n_test:,} rows: tree by tree {t_each*1000:7.1f} ms  all trees batched {t_batch*1000:7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
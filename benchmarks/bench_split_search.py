@@ -0,0 +1,53 @@
+"""Vectorized vs row by row split search in DecisionTree.
+
+Checks that both versions pick the same var_idx/split and reports the
+speedup on dataForDecisionTree.txt and on a synthetic 1M row data set.
+"""
+import numpy as np
+import pandas as pd
+
+from common import best_of, load_decision_tree, load_student_grades, same_tree
+
+dt = load_decision_tree()
+
+
+class LoopDecisionTree(dt.DecisionTree):
+    find_better_split = dt.DecisionTree.find_better_split_loop
+
+
+def root_split(cls, x, y, min_leaf):
+    tree = cls(x, y, min_leaf=min_leaf, max_depth=0)
+    tree.find_varsplit = None
+    for i in range(tree.c): tree.find_better_split(i)
+    return tree.var_idx, tree.split, tree.score
+
+
+def main():
+    X, Y = load_student_grades()
+    print('dataForDecisionTree.txt, full tree builds')
+    for min_leaf, max_depth in [(0, 5), (2, 10), (5, 100)]:
+        t_loop, loop_tree = best_of(lambda: LoopDecisionTree(X, Y, min_leaf=min_leaf, max_depth=max_depth))
+        t_vec, vec_tree = best_of(lambda: dt.DecisionTree(X, Y, min_leaf=min_leaf, max_depth=max_depth))
+        assert same_tree(loop_tree, vec_tree, compare_scores=True)
+        print(f'  min_leaf={min_leaf:<3} max_depth={max_depth:<4} loop {t_loop*1000:9.1f} ms'
+              f'  vectorized {t_vec*1000:8.1f} ms  speedup {t_loop/t_vec:6.1f}x')
+
+    t_loop, loop_split = best_of(lambda: root_split(LoopDecisionTree, X, Y, 2), repeat=20)
+    t_vec, vec_split = best_of(lambda: root_split(dt.DecisionTree, X, Y, 2), repeat=20)
+    assert loop_split == vec_split
+    print(f'  root split search only: loop {t_loop*1000:6.2f} ms  vectorized {t_vec*1000:6.2f} ms'
+          f'  speedup {t_loop/t_vec:6.1f}x')
+
+    n, c = 1_000_000, 3
+    rng = np.random.default_rng(0)
+    x = pd.DataFrame(np.column_stack([rng.integers(0, 1000, n), rng.normal(size=n), rng.integers(0, 2, n)]).astype(float))
+    y = 3 * x[0].values + 50 * x[2].values + rng.normal(scale=100, size=n)
+    print(f'synthetic {n:,} rows x {c} columns, root split search')
+    t_loop, loop_split = best_of(lambda: root_split(LoopDecisionTree, x, y, 5), repeat=1)
+    t_vec, vec_split = best_of(lambda: root_split(dt.DecisionTree, x, y, 5))
+    assert loop_split[:2] == vec_split[:2]
+    print(f'  loop {t_loop:7.2f} s  vectorized {t_vec:6.2f} s  speedup {t_loop/t_vec:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Fixed seed regression suite for the DecisionTree and Network hot paths, with JSON results.
+
+Every case runs on synthetic data at a few sizes, made from fixed seeds so
+two runs (or two versions of the code) measure the same work:
+
+* tree/<mode>/<rows>: one DecisionTree build (exact, presort and hist) on
+  8 feature regression data, with the TreeStats of the build: node count,
+  time in the split searches and rows scanned per second.
+* network/<dtype>/<rows>: one batched training epoch of a [784,25,30,10]
+  network on synthetic MNIST shaped digits, with the NetworkStats of the
+  epoch: samples per second and the forward/backward time of every layer,
+  plus the predict_batch throughput.
+
+Writes the results and the environment (versions, CPU count, git commit) to
+--out, benchmarks/results/bench_suite.json by default (benchmarks/results/
+is git ignored). Given --compare OLD.json it prints the change of the main
+number of every case against an earlier run:
+
+    python benchmarks/bench_suite.py --out benchmarks/results/before.json
+    ... change the code ...
+    python benchmarks/bench_suite.py --out benchmarks/results/after.json --compare benchmarks/results/before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import REPO_ROOT, best_of, load_decision_tree, load_mnist, load_network
+
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+
+dt = load_decision_tree()
+nn = load_network()
+
+TREE_ROWS = [1_000, 10_000, 100_000]
+NETWORK_ROWS = [2_000, 10_000, 30_000]
+QUICK_ROWS = 2  #--quick runs only the first two sizes of each
+
+
+def tree_data(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.column_stack([rng.normal(size=n) for _ in range(6)] + [rng.integers(0, 2, n), rng.integers(0, 20, n)])
+    y = 10 * np.sin(x[:, 0]) + 5 * x[:, 1] * x[:, 6] + x[:, 2] ** 2 + 0.5 * x[:, 7] + rng.normal(size=n)
+    return pd.DataFrame(x, columns=[f'x{i}' for i in range(x.shape[1])]), y
+
+
+def tree_case(mode, n, repeat):
+    x, y = tree_data(n)
+    settings = dict(exact={}, presort=dict(presort=True), hist=dict(hist=True))[mode]
+
+    def build():
+        stats = dt.TreeStats()
+        t0 = time.perf_counter()
+        dt.DecisionTree(x, y, min_leaf=5, max_depth=8, stats=stats, **settings)
+        return time.perf_counter() - t0, stats
+
+    seconds, stats = min((build() for _ in range(repeat)), key=lambda run: run[0])
+    return dict(name=f'tree/{mode}/{n}', seconds=seconds, rows=n, **stats.as_dict())
+
+
+def network_case(dtype, n, repeat):
+    x, y, synthetic = load_mnist(n, seed=0)
+
+    def epoch():
+        np.random.seed(0)
+        random.seed(0)
+        net = nn.Network([784, 25, 30, 10], learning_rate=5, mini_batch_size=32, dtype=dtype)
+        net.stats = nn.NetworkStats(net.sizes)
+        net.train_epoch(x, y)
+        return net
+
+    net = max((epoch() for _ in range(repeat)), key=lambda net: net.stats.samples_per_second)
+    predict_seconds, _ = best_of(lambda: net.predict_batch(x), repeat)
+    return dict(name=f'network/{np.dtype(dtype).name}/{n}', rows=n, synthetic=synthetic,
+                predict_rows_per_second=n / predict_seconds, **net.stats.as_dict())
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return dict(python=platform.python_version(), numpy=np.__version__, pandas=pd.__version__, platform=platform.platform(),
+                cpu_count=os.cpu_count(), commit=commit or None, time=time.strftime('%Y-%m-%dT%H:%M:%S'), argv=sys.argv[1:])
+
+
+def headline(case):
+    #the number --compare reports for a case, higher is better
+    if case['name'].startswith('tree/'):
+        return 'rows_per_second', case['rows_per_second']
+    return 'samples_per_second', case['samples_per_second']
+
+
+def compare(cases, old_path):
+    with open(old_path) as f:
+        old = {case['name']: case for case in json.load(f)['cases']}
+    print(f'against {old_path}:')
+    for case in cases:
+        if case['name'] not in old:
+            continue
+        metric, new_value = headline(case)
+        _, old_value = headline(old[case['name']])
+        print(f'  {case["name"]:<26} {metric:<19} {old_value:14,.0f} -> {new_value:14,.0f}  {new_value/old_value:6.2f}x'
+              f'   build/epoch {old[case["name"]]["seconds"]:8.3f} s -> {case["seconds"]:8.3f} s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default=os.path.join(RESULTS_DIR, 'bench_suite.json'))
+    parser.add_argument('--compare', metavar='OLD.json')
+    parser.add_argument('--repeat', type=int, default=3, help='every case reports the best of this many runs')
+    parser.add_argument('--quick', action='store_true', help='only the smaller sizes')
+    args = parser.parse_args()
+
+    tree_rows = TREE_ROWS[:QUICK_ROWS] if args.quick else TREE_ROWS
+    network_rows = NETWORK_ROWS[:QUICK_ROWS] if args.quick else NETWORK_ROWS
+    cases = []
+    for n in tree_rows:
+        for mode in ['exact', 'presort', 'hist']:
+            cases.append(tree_case(mode, n, args.repeat))
+            c = cases[-1]
+            print(f'{c["name"]:<26} build {c["seconds"]*1000:9.1f} ms  {c["nodes"]:4d} nodes'
+                  f'  split search {c["split_seconds"]*1000:9.1f} ms  {c["rows_per_second"]:14,.0f} rows/s')
+    for n in network_rows:
+        for dtype in [np.float64, np.float32]:
+            cases.append(network_case(dtype, n, args.repeat))
+            c = cases[-1]
+            layers = '  '.join(f'{layer["layer"]} {layer["forward_seconds"]*1000:.0f}/{layer["backward_seconds"]*1000:.0f} ms'
+                               for layer in c['layers'])
+            print(f'{c["name"]:<26} epoch {c["seconds"]*1000:9.1f} ms  {c["samples_per_second"]:10,.0f} samples/s'
+                  f'  forward/backward {layers}  predict {c["predict_rows_per_second"]:12,.0f} rows/s')
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(dict(environment=environment(), cases=cases), f, indent=1)
+    print(f'wrote {len(cases)} cases to {args.out}')
+    if args.compare:
+        compare(cases, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""sweep_min_leaf_max_depth vs one DecisionTree per (min_leaf, max_depth) pair.
+
+By default a slice of the script's 51 x 99 grid is brute forced, pass
+--full to brute force the whole grid (several minutes).
+"""
+import argparse
+import time
+
+import numpy as np
+
+from common import load_decision_tree, load_student_grades, rel_mae
+
+dt = load_decision_tree()
+
+
+def brute_force(x_train, y_train, x_test, y_test, min_leafs, max_depths):
+    mae = np.empty((len(min_leafs), len(max_depths)))
+    for i, min_leaf in enumerate(min_leafs):
+        for j, max_depth in enumerate(max_depths):
+            tree = dt.DecisionTree(x_train, y_train, min_leaf=min_leaf, max_depth=max_depth)
+            mae[i, j] = rel_mae(tree.predict(x_test), y_test)
+    return mae
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--full', action='store_true', help='brute force all 51 x 99 pairs')
+    args = parser.parse_args()
+
+    X, Y = load_student_grades()
+    cut = int(0.2 * len(X))
+    x_train, y_train, x_test, y_test = X[cut:], Y[cut:], X[:cut], Y[:cut]
+    min_leafs = list(range(51)) if args.full else list(range(0, 51, 10))
+    max_depths = list(range(2, 101))
+
+    t0 = time.perf_counter()
+    expected = brute_force(x_train, y_train, x_test, y_test, min_leafs, max_depths)
+    t_brute = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    surface = dt.sweep_min_leaf_max_depth(x_train, y_train, x_test, y_test, min_leafs, max_depths)
+    t_sweep = time.perf_counter() - t0
+    assert np.array_equal(expected, surface)
+    print(f'{len(min_leafs)} min_leaf x {len(max_depths)} max_depth, identical MAE surfaces')
+    print(f'  one tree per pair : {len(min_leafs) * len(max_depths):5} trees {t_brute:8.2f} s')
+    print(f'  sweep             : {len(min_leafs):5} trees {t_sweep:8.2f} s  speedup {t_brute/t_sweep:6.1f}x')
+
+    if not args.full:
+        t0 = time.perf_counter()
+        dt.sweep_min_leaf_max_depth(x_train, y_train, x_test, y_test, range(51), max_depths)
+        print(f'  full 51 x 99 grid with the sweep: {time.perf_counter() - t0:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Allocations and speed of one batched training step of Network.
+
+Compares Network.backpropagation_batch (plain numpy, new arrays for every
+intermediate and every updated weight matrix) with TrainingEngine.step
+(preallocated buffers, in place updates) in float64 and float32:
+
+- bytes allocated per step, traced with tracemalloc: the peak above the
+  memory already in use, and what is still allocated after the steps
+- steps per second
+- how far the engine's weights are from backpropagation_batch's after
+  the same 50 batches (further on, with learning_rate=5, the rounding
+  differences of float64 grow as well, so more steps say little)
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from common import load_mnist, load_network
+
+nn = load_network()
+
+SIZES = [784, 25, 30, 10]
+
+
+def make_network(mini_batch_size, dtype=np.float64):
+    np.random.seed(0)
+    return nn.Network(SIZES, learning_rate=5, mini_batch_size=mini_batch_size, dtype=dtype)
+
+
+def reference_step(net, x, y):
+    def step(batch):
+        net.backpropagation_batch(x[batch].T, y[batch].T)
+    return step
+
+
+def engine_step(net, x, y):
+    engine = net.training_engine()
+    x, y = x.astype(net.dtype), y.astype(net.dtype)
+    return lambda batch: engine.step(x, y, batch)
+
+
+def traced(step, batches):
+    #peak and leftover bytes of the steps, above what was allocated before them
+    step(batches[0])
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for batch in batches:
+        step(batch)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - before, current - before
+
+
+def steps_per_second(step, batches):
+    t0 = time.perf_counter()
+    for batch in batches:
+        step(batch)
+    return len(batches) / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000)
+    args = parser.parse_args()
+
+    x, y, synthetic = load_mnist(args.rows)
+    order = np.random.default_rng(0).permutation(len(x))
+    print(f'{len(x):,} {"synthetic " if synthetic else ""}MNIST rows, {SIZES} network')
+    for mini_batch_size in [10, 128]:
+        batches = [order[k:k + mini_batch_size] for k in range(0, len(order), mini_batch_size)]
+        print(f'mini_batch_size={mini_batch_size}')
+        reference_weights = None
+        for name, make_step, dtype in [('backpropagation_batch', reference_step, np.float64),
+                                       ('engine float64', engine_step, np.float64),
+                                       ('engine float32', engine_step, np.float32)]:
+            net = make_network(mini_batch_size, dtype)
+            step = make_step(net, x, y)
+            for batch in batches[:50]:
+                step(batch)
+            if reference_weights is None:
+                reference_weights, drift = [w.copy() for w in net.weights], 0.0
+            else:
+                drift = max(np.abs(w - r).max() for w, r in zip(net.weights, reference_weights))
+            peak, leftover = traced(step, batches[:50])
+            rate = steps_per_second(step, batches)
+            print(f'  {name:<22} peak {peak:>9,} B  left {leftover:>6,} B  {rate:9,.0f} steps/s'
+                  f'  max |w - reference| {drift:.1e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Shared helpers for the benchmark scripts.
+
+The benchmarks are run from the repository root, e.g.
+
+    python benchmarks/bench_split_search.py
+"""
+import importlib.util
+import multiprocessing
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_script(filename, module_name):
+    """Import one of the top level scripts (e.g. "Decision Tree.py") as a module.
+
+    The scripts only run their demo code under ``if __name__ == '__main__'``,
+    so importing them just defines the classes and functions. The repository
+    root goes on sys.path so their own imports (e.g. SharedArrays) resolve.
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_decision_tree():
+    return load_script('Decision Tree.py', 'decision_tree')
+
+
+def mp_context():
+    """The multiprocessing context for the process pools of the benchmarks.
+
+    "Decision Tree.py" is imported under a made up module name, which only
+    forked workers already know, so this is 'fork' where the platform has it
+    and the default context (None) otherwise.
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def same_tree(a, b, compare_scores=False):
+    """Whether two DecisionTrees split on the same columns at the same points and put the same rows in every leaf.
+
+    With compare_scores the split scores must be identical too, which only
+    holds when both trees sum the rows in the same order.
+    """
+    import numpy as np
+    if a.is_leaf or b.is_leaf:
+        return a.is_leaf == b.is_leaf and np.array_equal(a.idxs, b.idxs)
+    return (a.var_idx == b.var_idx and a.split == b.split and (not compare_scores or a.score == b.score)
+            and same_tree(a.lhs, b.lhs, compare_scores) and same_tree(a.rhs, b.rhs, compare_scores))
+
+
+def rel_mae(y_hat, y):
+    """The out of sample error of "Decision Tree.py", mean(|y_hat - y|) / mean(y)."""
+    import numpy as np
+    return np.mean(np.abs(y_hat - y)) / np.mean(y)
+
+
+def load_student_grades():
+    """The same X/Y the "Decision Tree.py" script trains on."""
+    import numpy as np
+    import pandas as pd
+    df = pd.read_csv(os.path.join(REPO_ROOT, 'dataForDecisionTree.txt'))
+    X = df.loc[:, ['school', 'sex', 'age', 'address', 'absences']]
+    Y = np.asarray(df.G1 + df.G2 + df.G3)
+    X = pd.get_dummies(X, columns=['school', 'sex', 'address'], drop_first=True)
+    return X, Y
+
+
+def load_network():
+    return load_script('NeuralNetwork.py', 'neural_network')
+
+
+def load_mnist(n=None, split='train', seed=0):
+    """x (n x 784) and one-hot y (n x 10) prepared the way "NeuralNetwork.py" prepares them.
+
+    Reads mnist_<split>.csv from the repository root when it is there. Otherwise
+    makes MNIST shaped synthetic digits, noisy copies of ten random prototype
+    images, so the benchmarks still run (and still learn) without the data.
+    Returns x, y and whether the data is synthetic.
+    """
+    import numpy as np
+    import pandas as pd
+    path = os.path.join(REPO_ROOT, f'mnist_{split}.csv')
+    if os.path.exists(path):
+        df = pd.read_csv(path, nrows=n)
+        pixels = df.loc[:, df.columns != 'label'].to_numpy(dtype=float)
+        labels = df['label'].to_numpy()
+        synthetic = False
+    else:
+        n = n or (60_000 if split == 'train' else 10_000)
+        prototypes = np.random.default_rng(0).integers(0, 256, (10, 784))
+        rng = np.random.default_rng(seed + (split != 'train'))
+        labels = rng.integers(0, 10, n)
+        pixels = np.clip(prototypes[labels] + rng.normal(scale=160, size=(n, 784)), 0, 255).round()
+        synthetic = True
+    x = pixels * 0.99 / 255 + .01
+    y = np.where(labels[:, None] == np.arange(10), 0.99, 0.01)
+    return x, y, synthetic
+
+
+def best_of(fn, repeat=3):
+    """Best wall clock time of ``repeat`` calls of ``fn`` and its last result."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result